@@ -14,6 +14,12 @@ python manage.py collectstatic --no-input
 # Run migrations
 python manage.py migrate
 
+# Index existing posts, projects, resources and events for site search
+python manage.py rebuild_search_index
+
+# Sync the points ledger and rebuild member points and levels
+python manage.py recompute_progress
+
 # Create superuser if needed (optional - comment out if not needed)
 # python manage.py createsuperuser --noinput --username admin --email admin@karuasa.ac.ke || true
 
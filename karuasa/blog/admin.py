@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from .models import BlogPost, BlogComment
+from core.search import reindex
+from core.images import variant_url
 
 class BlogCommentInline(admin.TabularInline):
     model = BlogComment
@@ -41,23 +43,30 @@ class BlogPostAdmin(admin.ModelAdmin):
 
     def display_featured_image(self, obj):
         if obj.featured_image:
-            return format_html('<img src="{}" width="80" height="60" style="object-fit: cover;" />', obj.featured_image.url)
+            return format_html('<img src="{}" width="80" height="60" style="object-fit: cover;" />', variant_url(obj.featured_image, 200))
         return "No Image"
     display_featured_image.short_description = 'Image'
 
     def approve_posts(self, request, queryset):
+        # A filtered changelist's queryset may no longer match once updated
+        pks = list(queryset.values_list('pk', flat=True))
         queryset.update(is_approved=True)
-        self.message_user(request, f'{queryset.count()} posts approved.')
+        reindex(BlogPost.objects.filter(pk__in=pks))
+        self.message_user(request, f'{len(pks)} posts approved.')
     approve_posts.short_description = "Approve selected posts"
 
     def publish_posts(self, request, queryset):
+        pks = list(queryset.values_list('pk', flat=True))
         queryset.update(is_published=True)
-        self.message_user(request, f'{queryset.count()} posts published.')
+        reindex(BlogPost.objects.filter(pk__in=pks))
+        self.message_user(request, f'{len(pks)} posts published.')
     publish_posts.short_description = "Publish selected posts"
 
     def unpublish_posts(self, request, queryset):
+        pks = list(queryset.values_list('pk', flat=True))
         queryset.update(is_published=False)
-        self.message_user(request, f'{queryset.count()} posts unpublished.')
+        reindex(BlogPost.objects.filter(pk__in=pks))
+        self.message_user(request, f'{len(pks)} posts unpublished.')
     unpublish_posts.short_description = "Unpublish selected posts"
 
 @admin.register(BlogComment)
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogcomment',
+            index=models.Index(fields=['post', '-created_at', '-id'], name='blog_blogco_post_id_a42999_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['is_published', 'is_approved', '-created_at', '-id'], name='blog_blogpo_is_publ_c4b37d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('is_approved', True), ('is_published', True)), fields=['-created_at', '-id'], name='blog_post_listed_idx'),
+        ),
+    ]
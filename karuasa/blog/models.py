@@ -1,3 +1,4 @@
+from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
 from members.models import Member
 
@@ -12,6 +13,17 @@ class BlogPost(models.Model):
     shares = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    like_records = GenericRelation('core.Like')  # Deleted along with the object
+
+    class Meta:
+        # Matches the post_list filter and its keyset order. MySQL compares boolean
+        # filters with "= 1" and uses the composite index; SQLite and PostgreSQL get
+        # a bare "WHERE is_published", which only a partial index can serve.
+        indexes = [
+            models.Index(fields=['is_published', 'is_approved', '-created_at', '-id']),
+            models.Index(fields=['-created_at', '-id'], name='blog_post_listed_idx',
+                         condition=models.Q(is_published=True, is_approved=True)),
+        ]
 
     def __str__(self):
         return self.title
@@ -25,6 +37,7 @@ class BlogComment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['post', '-created_at', '-id'])]
 
     def __str__(self):
         return f"Comment by {self.author} on {self.post.title}"
\ No newline at end of file
@@ -1,3 +1,114 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from members.models import Member
+from .models import BlogPost, BlogComment
 
-# Create your tests here.
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class PostListQueryCountTests(TestCase):
+    """post_list must cost the same number of queries however many cards are on the page"""
+
+    QUERY_BUDGET = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = [
+            Member.objects.create(username=f'author{i}', registration_number=f'REG{i}')
+            for i in range(3)
+        ]
+
+    def create_posts(self, count):
+        for i in range(count):
+            post = BlogPost.objects.create(
+                title=f'Post {i}',
+                content='Content',
+                author=self.authors[i % len(self.authors)],
+                is_published=True,
+                is_approved=True,
+            )
+            for author in self.authors:
+                BlogComment.objects.create(post=post, author=author, content='Nice post')
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('blog:post_list'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_is_independent_of_page_size(self):
+        self.create_posts(1)
+        self.count_queries()  # warm the SiteInfo memo
+        one_post = self.count_queries()
+
+        self.create_posts(5)
+        full_page = self.count_queries()
+
+        self.assertEqual(one_post, full_page)
+        self.assertLessEqual(full_page, self.QUERY_BUDGET)
+
+    def test_comment_count_is_annotated(self):
+        self.create_posts(2)
+        response = self.client.get(reverse('blog:post_list'))
+        for post in response.context['posts']:
+            self.assertEqual(post.comment_count, len(self.authors))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class PostDetailCommentTests(TestCase):
+    """post_detail must render a fixed number of queries however many comments a post has"""
+
+    QUERY_BUDGET = 6
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = [
+            Member.objects.create(username=f'commenter{i}', registration_number=f'COM{i}')
+            for i in range(3)
+        ]
+        cls.post = BlogPost.objects.create(
+            title='Busy post', content='Content', author=cls.authors[0],
+            is_published=True, is_approved=True,
+        )
+
+    def add_comments(self, count):
+        for i in range(count):
+            comment = BlogComment.objects.create(
+                post=self.post, author=self.authors[i % len(self.authors)], content=f'Comment {i}'
+            )
+            comment.mentions.set(self.authors[:2])
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('blog:post_detail', args=[self.post.pk]))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_is_independent_of_comment_count(self):
+        self.add_comments(1)
+        self.count_queries()  # warm the SiteInfo memo
+        one_comment = self.count_queries()
+
+        self.add_comments(60)
+        many_comments = self.count_queries()
+
+        self.assertEqual(one_comment, many_comments)
+        self.assertLessEqual(many_comments, self.QUERY_BUDGET)
+
+    def test_load_more_walks_every_comment_once(self):
+        self.add_comments(45)
+        response = self.client.get(reverse('blog:post_detail', args=[self.post.pk]))
+        rendered = len(response.context['comments'])
+        cursor = response.context['next_cursor']
+
+        while cursor:
+            data = self.client.get(
+                reverse('blog:post_comments', args=[self.post.pk]), {'cursor': cursor}
+            ).json()
+            rendered += data['html'].count('class="comment-item')
+            cursor = data['next_cursor']
+
+        self.assertEqual(rendered, 45)
@@ -1,31 +1,47 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.http import JsonResponse
+from django.http import JsonResponse, Http404
+from django.db.models import Count
 from .models import BlogPost, BlogComment
 from .forms import BlogPostForm, BlogCommentForm
 from django.views.decorators.http import require_POST
+from core.counters import increment_counter
+from core.likes import like_object, liked_ids
+from core.pagination import KeysetPaginator, cursor_page
 from .models import BlogPost
 
 def post_list(request):
+    # Author and comment count come back in the page query, so the cards add no queries
     posts_list = BlogPost.objects.filter(
         is_published=True, 
         is_approved=True
-    ).order_by('-created_at')
+    ).select_related('author').annotate(comment_count=Count('comments'))
     
-    paginator = Paginator(posts_list, 6)
-    page_number = request.GET.get('page')
-    posts = paginator.get_page(page_number)
+    paginator = KeysetPaginator(posts_list, 6, count_timeout=300)
+    posts = paginator.get_page(request.GET)
     
     context = {
         'posts': posts,
+        'liked_post_ids': liked_ids(request.user, BlogPost, [post.pk for post in posts]),
     }
     return render(request, 'blog/post_list.html', context)
 
+COMMENTS_PER_PAGE = 20
+
+
+def _comment_queryset(post):
+    # Authors are joined and mentions fetched in one extra query per page, however many comments there are
+    return post.comments.select_related('author').prefetch_related('mentions')
+
+
 def post_detail(request, pk):
-    post = get_object_or_404(BlogPost, pk=pk, is_published=True, is_approved=True)
-    comments = post.comments.all()
+    post = get_object_or_404(
+        BlogPost.objects.select_related('author'),
+        pk=pk, is_published=True, is_approved=True
+    )
+    comments, next_cursor = cursor_page(_comment_queryset(post), None, COMMENTS_PER_PAGE)
     
     if request.method == 'POST':
         if not request.user.is_authenticated:
@@ -46,10 +62,22 @@ def post_detail(request, pk):
     context = {
         'post': post,
         'comments': comments,
+        'comment_count': post.comments.count(),
+        'next_cursor': next_cursor,
         'comment_form': comment_form,
+        'is_liked': bool(liked_ids(request.user, BlogPost, [post.pk])),
     }
     return render(request, 'blog/post_detail.html', context)
 
+def post_comments(request, pk):
+    """Next page of comments for the "Load more" button, as rendered HTML"""
+    post = get_object_or_404(BlogPost, pk=pk, is_published=True, is_approved=True)
+    comments, next_cursor = cursor_page(
+        _comment_queryset(post), request.GET.get('cursor'), COMMENTS_PER_PAGE
+    )
+    html = render_to_string('blog/comments.html', {'comments': comments}, request=request)
+    return JsonResponse({'html': html, 'next_cursor': next_cursor})
+
 @login_required
 def add_post(request):
     if request.method == 'POST':
@@ -68,26 +96,26 @@ def add_post(request):
 
 @login_required
 def like_post(request, pk):
-    post = get_object_or_404(BlogPost, pk=pk)
-    post.likes += 1
-    post.save()
+    likes, created = like_object(request.user, BlogPost, pk)
+    if likes is None:
+        raise Http404('No BlogPost matches the given query.')
     
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        return JsonResponse({'success': True, 'likes': post.likes})
+        return JsonResponse({'success': True, 'likes': likes, 'liked': True})
     
-    messages.success(request, 'Post liked!')
+    if created:
+        messages.success(request, 'Post liked!')
+    else:
+        messages.info(request, 'You have already liked this post.')
     return redirect('blog:post_detail', pk=pk)
 
 
 @require_POST
 def share_post(request, post_id):
-    try:
-        post = BlogPost.objects.get(id=post_id)
-        post.shares += 1
-        post.save()
-        return JsonResponse({
-            'success': True,
-            'new_share_count': post.shares
-        })
-    except BlogPost.DoesNotExist:
-        return JsonResponse({'success': False}, status=404)
\ No newline at end of file
+    shares = increment_counter(BlogPost, post_id, 'shares')
+    if shares is None:
+        return JsonResponse({'success': False}, status=404)
+    return JsonResponse({
+        'success': True,
+        'new_share_count': shares
+    })
\ No newline at end of file
@@ -1,6 +1,10 @@
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import format_html
-from .models import SiteInfo, SliderImage, Partner, Testimonial, Leader,Constitution, ContactMessage
+from .models import SiteInfo, SliderImage, Partner, Testimonial, Leader,Constitution, ContactMessage, ChatbotResponse, Like, ScheduledTask
+from .services import get_chatbot_cache_stats, reset_chatbot_cache_stats
+from .signals import clear_home_cache
+from .images import variant_url
 
 @admin.register(SiteInfo)
 class SiteInfoAdmin(admin.ModelAdmin):
@@ -9,7 +13,7 @@ class SiteInfoAdmin(admin.ModelAdmin):
     
     def display_logo(self, obj):
         if obj.logo:
-            return format_html('<img src="{}" width="50" height="50" />', obj.logo.url)
+            return format_html('<img src="{}" width="50" height="50" />', variant_url(obj.logo, 200))
         return "No Logo"
     display_logo.short_description = 'Logo'
 
@@ -22,7 +26,7 @@ class SliderImageAdmin(admin.ModelAdmin):
     
     def display_image(self, obj):
         if obj.image:
-            return format_html('<img src="{}" width="100" height="60" style="object-fit: cover;" />', obj.image.url)
+            return format_html('<img src="{}" width="100" height="60" style="object-fit: cover;" />', variant_url(obj.image, 200))
         return "No Image"
     display_image.short_description = 'Image'
 
@@ -35,7 +39,7 @@ class PartnerAdmin(admin.ModelAdmin):
     
     def display_logo(self, obj):
         if obj.logo:
-            return format_html('<img src="{}" width="60" height="60" style="object-fit: contain;" />', obj.logo.url)
+            return format_html('<img src="{}" width="60" height="60" style="object-fit: contain;" />', variant_url(obj.logo, 200))
         return "No Logo"
     display_logo.short_description = 'Logo'
 
@@ -53,11 +57,13 @@ class TestimonialAdmin(admin.ModelAdmin):
     
     def approve_testimonials(self, request, queryset):
         queryset.update(is_approved=True)
+        clear_home_cache()
         self.message_user(request, f'{queryset.count()} testimonials approved.')
     approve_testimonials.short_description = "Approve selected testimonials"
     
     def disapprove_testimonials(self, request, queryset):
         queryset.update(is_approved=False)
+        clear_home_cache()
         self.message_user(request, f'{queryset.count()} testimonials disapproved.')
     disapprove_testimonials.short_description = "Disapprove selected testimonials"
 
@@ -71,7 +77,7 @@ class LeaderAdmin(admin.ModelAdmin):
     
     def display_image(self, obj):
         if obj.image:
-            return format_html('<img src="{}" width="50" height="50" style="object-fit: cover; border-radius: 50%;" />', obj.image.url)
+            return format_html('<img src="{}" width="50" height="50" style="object-fit: cover; border-radius: 50%;" />', variant_url(obj.image, 200))
         return "No Image"
     display_image.short_description = 'Image'
     
@@ -125,4 +131,63 @@ class ContactMessageAdmin(admin.ModelAdmin):
         ('Admin Management', {
             'fields': ('status', 'admin_notes')
         }),
-    )
\ No newline at end of file
+    )
+
+@admin.register(ChatbotResponse)
+class ChatbotResponseAdmin(admin.ModelAdmin):
+    list_display = ['normalized_prompt', 'response_preview', 'hits', 'created_at', 'last_used_at']
+    search_fields = ['normalized_prompt']
+    readonly_fields = ['prompt_hash', 'normalized_prompt', 'hits', 'created_at', 'last_used_at']
+    actions = ['purge_entries', 'reset_statistics']
+
+    def has_add_permission(self, request):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        stats = get_chatbot_cache_stats()
+        total = stats['hits'] + stats['misses']
+        hit_rate = round(100 * stats['hits'] / total, 1) if total else 0
+        self.message_user(request, f"Cache hits: {stats['hits']}, misses: {stats['misses']} ({hit_rate}% hit rate)")
+        return super().changelist_view(request, extra_context)
+
+    def response_preview(self, obj):
+        return obj.response[:100] + '...' if len(obj.response) > 100 else obj.response
+    response_preview.short_description = 'Response'
+
+    def purge_entries(self, request, queryset):
+        count, _ = queryset.delete()
+        self.message_user(request, f'{count} cached responses purged.')
+    purge_entries.short_description = "Purge selected cached responses"
+
+    def reset_statistics(self, request, queryset):
+        reset_chatbot_cache_stats()
+        self.message_user(request, 'Cache hit/miss counters reset.')
+    reset_statistics.short_description = "Reset cache hit/miss counters"
+
+@admin.register(Like)
+class LikeAdmin(admin.ModelAdmin):
+    list_display = ['member', 'content_type', 'object_id', 'created_at']
+    list_filter = ['content_type', 'created_at']
+    search_fields = ['member__username']
+    readonly_fields = ['member', 'content_type', 'object_id', 'created_at']
+    list_select_related = ['member', 'content_type']
+
+
+@admin.register(ScheduledTask)
+class ScheduledTaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'schedule', 'is_active', 'next_run_at', 'last_run_at', 'last_status']
+    list_filter = ['is_active', 'last_status']
+    list_editable = ['is_active']
+    readonly_fields = ['task', 'next_run_at', 'last_run_at', 'last_status', 'last_error']
+    actions = ['run_now']
+
+    def save_model(self, request, obj, form, change):
+        if 'schedule' in form.changed_data:
+            # Picked up by the scheduler, which sets the next slot of the new schedule
+            obj.next_run_at = None
+        super().save_model(request, obj, form, change)
+
+    def run_now(self, request, queryset):
+        count = queryset.update(next_run_at=timezone.now())
+        self.message_user(request, f'{count} tasks will run within a minute.')
+    run_now.short_description = "Run selected tasks now"
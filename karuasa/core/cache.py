@@ -0,0 +1,22 @@
+import random
+from django.core.cache.backends.filebased import FileBasedCache
+
+
+class SampledCullFileBasedCache(FileBasedCache):
+    """
+    FileBasedCache that checks the entry count on about one set() in
+    OPTIONS['CULL_CHECK_INTERVAL'] (default 100) instead of on every set().
+    The check lists the whole cache directory: with MAX_ENTRIES high enough to hold
+    the site's keys that costs over 100 ms, and Django's own backend pays it on each
+    write. The directory can grow past MAX_ENTRIES by about that many sets before it
+    is culled.
+    """
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._cull_check_interval = int(params.get('OPTIONS', {}).get('CULL_CHECK_INTERVAL', 100))
+
+    def _cull(self):
+        if self._cull_check_interval > 1 and random.randrange(self._cull_check_interval):
+            return
+        super()._cull()
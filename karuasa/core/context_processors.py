@@ -1,8 +1,45 @@
+from uuid import uuid4
+from django.core.cache import cache
+from django.db import transaction
 from .models import SiteInfo
 
-def site_info(request):
+# Shared version stamp; bumping it makes every process reload its copy
+SITE_INFO_VERSION_KEY = 'core:site_info:version'
+
+# (version, SiteInfo) memoized for the lifetime of this process
+_site_info_memo = (None, None)
+
+
+def get_site_info():
+    """Return the SiteInfo singleton, querying only when the shared version changed"""
+    global _site_info_memo
+    version = cache.get_or_set(SITE_INFO_VERSION_KEY, uuid4().hex, None)
+    memo_version, memo_value = _site_info_memo
+    if memo_version == version:
+        return memo_value
+
     try:
-        site_info = SiteInfo.objects.first()
-    except:
-        site_info = None
-    return {'site_info': site_info}
\ No newline at end of file
+        value = SiteInfo.objects.first()
+    except Exception:
+        # Tables may not be migrated yet; don't memoize the failure
+        return None
+    _site_info_memo = (version, value)
+    return value
+
+
+def clear_site_info(**kwargs):
+    """
+    Drop this process's copy and tell the other processes to drop theirs. Deferred
+    to commit: bumping the version earlier would let another process memoize the
+    old row under the new version until the next edit.
+    """
+    def clear():
+        global _site_info_memo
+        _site_info_memo = (None, None)
+        cache.set(SITE_INFO_VERSION_KEY, uuid4().hex, None)
+
+    transaction.on_commit(clear)
+
+
+def site_info(request):
+    return {'site_info': get_site_info()}
@@ -0,0 +1,45 @@
+from django.db import connection
+from django.db.models import F
+
+
+def increment_counter(model, pk, field, amount=1):
+    """
+    Atomically add `amount` to an integer column and return the new value, or None
+    if the row doesn't exist.
+
+    The increment is a single UPDATE on that one column, so concurrent clicks can't
+    lose updates, the row lock is held only for that statement and auto_now fields
+    such as updated_at are left alone. The new value comes back from the UPDATE
+    itself (RETURNING on SQLite/PostgreSQL, LAST_INSERT_ID(expr) on MySQL) instead
+    of re-reading the row.
+    """
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    column = qn(model._meta.get_field(field).column)
+    pk_column = qn(model._meta.pk.column)
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                f"UPDATE {table} SET {column} = LAST_INSERT_ID({column} + %s) WHERE {pk_column} = %s",
+                [amount, pk],
+            )
+            if not cursor.rowcount:
+                return None
+            cursor.execute("SELECT LAST_INSERT_ID()")
+            return cursor.fetchone()[0]
+
+        if connection.vendor == 'postgresql' or (
+            connection.vendor == 'sqlite' and connection.Database.sqlite_version_info >= (3, 35)
+        ):
+            cursor.execute(
+                f"UPDATE {table} SET {column} = {column} + %s WHERE {pk_column} = %s RETURNING {column}",
+                [amount, pk],
+            )
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+    # Older SQLite: still a lost-update-free increment, then read back just the one column
+    if not model.objects.filter(pk=pk).update(**{field: F(field) + amount}):
+        return None
+    return model.objects.filter(pk=pk).values_list(field, flat=True).first()
@@ -0,0 +1,80 @@
+from datetime import timedelta
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+
+class CronSchedule:
+    """
+    A five-field cron expression: minute, hour, day of month, month, day of week
+    (0 or 7 is Sunday). Fields accept *, numbers, ranges (1-5), lists (1,15) and
+    steps (*/10, 0-30/5). Times are matched in the site's time zone (settings.TIME_ZONE).
+    """
+    RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError('A schedule needs five fields: minute hour day month weekday')
+        self.minutes, self.hours, self.days, self.months, weekdays = [
+            self._parse(field, low, high) for field, (low, high) in zip(fields, self.RANGES)
+        ]
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day, self.any_weekday = fields[2] == '*', fields[4] == '*'
+
+    @staticmethod
+    def _parse(field, low, high):
+        values = set()
+        for part in field.split(','):
+            base, _, step = part.partition('/')
+            try:
+                if base == '*':
+                    start, end = low, high
+                elif '-' in base:
+                    start, end = map(int, base.split('-'))
+                else:
+                    # "5/15" means every 15 from 5 onwards
+                    start = int(base)
+                    end = high if step else start
+                step = int(step) if step else 1
+            except ValueError:
+                raise ValueError(f'Invalid schedule field: {part!r}')
+            if not low <= start <= end <= high or step < 1:
+                raise ValueError(f'Schedule field out of range: {part!r}')
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment):
+        weekday = (moment.weekday() + 1) % 7
+        if self.any_day and self.any_weekday:
+            return True
+        if self.any_day:
+            return weekday in self.weekdays
+        if self.any_weekday:
+            return moment.day in self.days
+        # As in cron, restricting both fields matches either
+        return moment.day in self.days or weekday in self.weekdays
+
+    def next_after(self, moment):
+        """The first matching minute strictly after `moment`"""
+        current = timezone.localtime(moment).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = current + timedelta(days=5 * 366)
+        while current < limit:
+            if current.month not in self.months:
+                current = (current.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(current):
+                current = current.replace(hour=0, minute=0) + timedelta(days=1)
+            elif current.hour not in self.hours:
+                current = current.replace(minute=0) + timedelta(hours=1)
+            elif current.minute not in self.minutes:
+                current += timedelta(minutes=1)
+            else:
+                return current
+        raise ValueError('Schedule never matches a real date')
+
+
+def validate_cron(expression):
+    """Model field validator for cron expressions"""
+    try:
+        CronSchedule(expression).next_after(timezone.now())
+    except ValueError as e:
+        raise ValidationError(str(e))
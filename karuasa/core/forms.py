@@ -1,3 +1,4 @@
+import zipfile
 from django import forms
 from .models import Testimonial
 
@@ -10,4 +11,37 @@ class ContactForm(forms.Form):
 class TestimonialForm(forms.ModelForm):
     class Meta:
         model = Testimonial
-        fields = ['content', 'role']
\ No newline at end of file
+        fields = ['content', 'role']
+
+class MultipleFileInput(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+
+class MultipleFileField(forms.FileField):
+    """FileField that accepts several files from one <input multiple>, cleaned to a list"""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('widget', MultipleFileInput())
+        super().__init__(*args, **kwargs)
+
+    def clean(self, data, initial=None):
+        if isinstance(data, (list, tuple)):
+            return [super(MultipleFileField, self).clean(item, initial) for item in data]
+        return [super().clean(data, initial)] if data else []
+
+
+class BulkUploadForm(forms.Form):
+    images = MultipleFileField(required=False, help_text='Select several images at once')
+    archive = forms.FileField(required=False, help_text='Or a .zip of images')
+
+    def clean_archive(self):
+        archive = self.cleaned_data.get('archive')
+        if archive and not zipfile.is_zipfile(archive):
+            raise forms.ValidationError('Upload a .zip file.')
+        return archive
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get('images') and not cleaned_data.get('archive'):
+            raise forms.ValidationError('Choose some images or a zip archive.')
+        return cleaned_data
@@ -0,0 +1,155 @@
+import os
+from io import BytesIO
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+# Pillow save options per output format
+FORMATS = {
+    'webp': {'format': 'WEBP', 'method': 4},
+    'avif': {'format': 'AVIF', 'speed': 8},
+    'jpeg': {'format': 'JPEG', 'optimize': True, 'progressive': True},
+}
+
+MIME_TYPES = {'webp': 'image/webp', 'avif': 'image/avif', 'jpeg': 'image/jpeg'}
+
+
+def variant_formats():
+    """Configured derivative formats this Pillow build can actually encode"""
+    return [fmt for fmt in settings.IMAGE_VARIANT_FORMATS if fmt == 'jpeg' or features.check(fmt)]
+
+
+def variant_name(name, width, fmt):
+    """Storage path of a derivative: blog/photo.jpg -> blog/variants/photo-400w.webp"""
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, 'variants', f'{stem}-{width}w.{fmt}')
+
+
+def _cache_key(name, width, fmt):
+    return f'core:images:{fmt}:{width}:{name}'
+
+
+def _render_variant(source, width, fmt):
+    image = ImageOps.exif_transpose(source)
+    if image.width > width:
+        image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+    if fmt == 'jpeg' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+        image = image.convert('RGBA')
+
+    buffer = BytesIO()
+    image.save(buffer, quality=settings.IMAGE_VARIANT_QUALITY, **FORMATS[fmt])
+    return buffer.getvalue()
+
+
+def generate_variants(field_file, widths=None, formats=None):
+    """
+    Write every missing width/format derivative of an uploaded image. Derivatives
+    already in storage are only looked up; the original is opened only if some are
+    missing, and decoded once for all of them. Widths larger than the original are
+    skipped (except the smallest), since they would only be upscaled copies.
+    Returns {(width, fmt): url} for the derivatives that exist; only the stored ones
+    if the original can't be read.
+    """
+    if not field_file:
+        return {}
+    storage, name = field_file.storage, field_file.name
+    widths = widths or settings.IMAGE_VARIANT_WIDTHS
+    formats = formats or variant_formats()
+
+    keys = {(width, fmt): _cache_key(name, width, fmt) for width in widths for fmt in formats}
+    cached = cache.get_many(keys.values())
+    urls = {variant: cached[key] for variant, key in keys.items() if cached.get(key)}
+
+    # Written earlier, e.g. before the cache was cleared: only the URL is needed
+    found, missing = {}, []
+    for variant, key in keys.items():
+        if key in cached:
+            continue
+        path = variant_name(name, *variant)
+        if storage.exists(path):
+            urls[variant] = found[key] = storage.url(path)
+        else:
+            missing.append(variant)
+    cache.set_many(found, None)
+    if not missing:
+        return urls
+
+    try:
+        # Image.open() only reads the header; the pixels are decoded by the first render
+        with storage.open(name, 'rb') as original, Image.open(original) as source:
+            for width, fmt in missing:
+                key = keys[(width, fmt)]
+                if width > source.width and width != min(widths):
+                    cache.set(key, '', None)  # Remembered, so the original isn't reopened
+                    continue
+                path = storage.save(variant_name(name, width, fmt), ContentFile(_render_variant(source, width, fmt)))
+                urls[(width, fmt)] = storage.url(path)
+                cache.set(key, urls[(width, fmt)], None)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        # Missing or not an image: serve the original and don't retry on every render
+        cache.set_many({keys[variant]: '' for variant in missing if variant not in urls}, 3600)
+    return urls
+
+
+def variant_url(field_file, width, fmt='webp'):
+    """
+    URL of the derivative of `field_file` at `width`, generating it on first use.
+    Falls back to the original upload if it is already smaller than `width` or
+    can't be processed.
+    """
+    if not field_file:
+        return ''
+    url = generate_variants(field_file, widths=[width], formats=[fmt]).get((width, fmt))
+    return url or field_file.url
+
+
+def variant_srcset(field_file, fmt='webp', widths=None):
+    """srcset value listing the derivatives of this image, generating missing ones"""
+    if not field_file:
+        return ''
+    urls = generate_variants(field_file, widths=widths, formats=[fmt])
+    return ', '.join(f'{url} {width}w' for (width, _), url in sorted(urls.items()))
+
+
+def process_upload(source_path, destination_path, max_size, quality):
+    """
+    Decode, orient, downscale and re-encode one uploaded image as a JPEG without
+    EXIF/GPS metadata. Runs in a bulk-upload pool process (core/uploads.py), so it
+    must not touch settings, the cache or the database.
+    Returns None on success or an error message.
+    """
+    try:
+        with Image.open(source_path) as image:
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_size, max_size), Image.LANCZOS)
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+            # A fresh image carries no exif/icc/xmp info unless passed explicitly
+            image.save(destination_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+        return None
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        return str(e)
+
+
+def mark_new_uploads(sender, instance, update_fields=None, **kwargs):
+    """pre_save handler: note which image fields hold a file uploaded with this save"""
+    new_uploads = []
+    for field_name in settings.IMAGE_VARIANT_FIELDS.get(sender._meta.label, []):
+        field_file = getattr(instance, field_name)
+        if field_file and not field_file._committed and (update_fields is None or field_name in update_fields):
+            new_uploads.append(field_name)
+    instance._new_image_uploads = new_uploads
+
+
+def generate_variants_on_save(sender, instance, **kwargs):
+    """
+    post_save handler: build derivatives of new uploads so the first visitor doesn't
+    wait. Other saves, e.g. a member's last_login update, leave the images alone.
+    """
+    for field_name in instance.__dict__.pop('_new_image_uploads', []):
+        generate_variants(getattr(instance, field_name))
@@ -0,0 +1,92 @@
+import hashlib
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import transaction
+from .counters import increment_counter
+from .models import Like
+
+# Bits per stored like and hash functions per key: roughly a 1% false-positive rate
+BLOOM_BITS_PER_ITEM = 10
+BLOOM_HASHES = 7
+BLOOM_MIN_BITS = 64
+
+
+class LikeBloomFilter:
+    """
+    Compact, probabilistic "has this member liked X?" index. A miss is definitive;
+    a hit only means "maybe" and is confirmed against the Like table.
+    """
+
+    def __init__(self, capacity):
+        self.size = max(BLOOM_MIN_BITS, capacity * BLOOM_BITS_PER_ITEM)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big')
+        return [(first + i * second) % self.size for i in range(BLOOM_HASHES)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position // 8] |= 1 << (position % 8)
+
+    def __contains__(self, key):
+        return all(self.bits[position // 8] & (1 << (position % 8)) for position in self._positions(key))
+
+
+def _index_key(member_id):
+    return f'core:likes:bloom:{member_id}'
+
+
+def _like_key(content_type_id, object_id):
+    return f'{content_type_id}:{object_id}'
+
+
+def get_like_index(member_id):
+    """Return the member's Bloom filter from the shared cache, building it with one query on a miss"""
+    bloom = cache.get(_index_key(member_id))
+    if bloom is None:
+        likes = list(Like.objects.filter(member_id=member_id).values_list('content_type_id', 'object_id'))
+        bloom = LikeBloomFilter(len(likes))
+        for content_type_id, object_id in likes:
+            bloom.add(_like_key(content_type_id, object_id))
+        cache.set(_index_key(member_id), bloom, 3600)
+    return bloom
+
+
+def liked_ids(member, model, object_ids):
+    """
+    Return the subset of `object_ids` the member has liked. Objects the filter rules out
+    cost nothing; the rest are confirmed with a single query.
+    """
+    if not member.is_authenticated:
+        return set()
+
+    content_type_id = ContentType.objects.get_for_model(model).id
+    bloom = get_like_index(member.pk)
+    candidates = [pk for pk in object_ids if _like_key(content_type_id, pk) in bloom]
+    if not candidates:
+        return set()
+    return set(Like.objects.filter(
+        member_id=member.pk, content_type_id=content_type_id, object_id__in=candidates
+    ).values_list('object_id', flat=True))
+
+
+def like_object(member, model, pk, field='likes'):
+    """
+    Record the member's like and bump the object's counter, once per member.
+    Returns (count, created), or (None, False) if the object doesn't exist.
+    """
+    content_type = ContentType.objects.get_for_model(model)
+    with transaction.atomic():
+        like, created = Like.objects.get_or_create(member=member, content_type=content_type, object_id=pk)
+        if not created:
+            return model.objects.filter(pk=pk).values_list(field, flat=True).first(), False
+
+        count = increment_counter(model, pk, field)
+        if count is None:
+            transaction.set_rollback(True)
+            return None, False
+        # Rebuilt from the table on next read, so concurrent likes can't drop bits
+        transaction.on_commit(lambda: cache.delete(_index_key(member.pk)))
+    return count, True
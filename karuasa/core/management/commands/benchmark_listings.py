@@ -0,0 +1,174 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    setup_test_environment, teardown_test_environment, override_settings, CaptureQueriesContext,
+)
+from django.utils import timezone
+from blog.models import BlogPost, BlogComment
+from core.pagination import encode_cursor
+from events.models import Event
+from gallery.models import Album
+from members.models import Member
+from projects.models import Project
+from resources.models import Resource, ResourceCategory
+
+LISTING_MODELS = [BlogPost, BlogComment, Project, Event, Resource, Album]
+
+# Keeps benchmark page counts and SiteInfo out of the site's shared cache
+BENCHMARK_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class Command(BaseCommand):
+    help = ('Seed a throwaway test database and time the public list views, '
+            'printing the query plan of each listing query')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000,
+                            help='Rows seeded per listed model')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Requests per URL; the median is reported')
+        parser.add_argument('--drop-indexes', action='store_true',
+                            help='Drop the listing indexes first, to compare against the old schema')
+
+    def handle(self, *args, **options):
+        # Never touch the real database: build a fresh test database and drop it afterwards
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        setup_test_environment()
+        try:
+            with override_settings(CACHES=BENCHMARK_CACHES):
+                if options['drop_indexes']:
+                    self.drop_indexes()
+                self.stdout.write(f'Seeding {options["rows"]} rows per model on {connection.vendor}...')
+                self.seed(options['rows'])
+                self.benchmark(options['repeat'])
+        finally:
+            teardown_test_environment()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def drop_indexes(self):
+        with connection.schema_editor() as editor:
+            for model in LISTING_MODELS:
+                for index in model._meta.indexes:
+                    editor.remove_index(model, index)
+
+    def seed(self, rows, batch_size=1000):
+        now = timezone.now()
+        authors = Member.objects.bulk_create([
+            Member(username=f'bench{i}', registration_number=f'BENCH{i}', member_type='student')
+            for i in range(100)
+        ])
+        categories = ResourceCategory.objects.bulk_create([
+            ResourceCategory(name=f'Category {i}') for i in range(10)
+        ])
+        resource_types = [choice for choice, _ in Resource.RESOURCE_TYPES]
+
+        for start in range(0, rows, batch_size):
+            size = min(batch_size, rows - start)
+            BlogPost.objects.bulk_create([
+                BlogPost(title=f'Post {start + i}', content='Benchmark post', author=random.choice(authors),
+                         featured_image='blog/bench.jpg', is_published=random.random() < 0.9,
+                         is_approved=random.random() < 0.8)
+                for i in range(size)
+            ])
+            Project.objects.bulk_create([
+                Project(title=f'Project {start + i}', description='Benchmark project',
+                        featured_image='projects/bench.jpg', is_approved=random.random() < 0.8,
+                        is_featured=random.random() < 0.1)
+                for i in range(size)
+            ])
+            Event.objects.bulk_create([
+                Event(title=f'Event {start + i}', description='Benchmark event', location='Karatina',
+                      event_type=random.choice(['upcoming', 'past']), featured_image='events/bench.jpg',
+                      date=now - timedelta(days=random.randint(-365, 3650)), is_active=random.random() < 0.9)
+                for i in range(size)
+            ])
+            Resource.objects.bulk_create([
+                Resource(title=f'Resource {start + i}', description='Benchmark resource',
+                         resource_type=random.choice(resource_types), category=random.choice(categories),
+                         is_active=random.random() < 0.9)
+                for i in range(size)
+            ])
+            Album.objects.bulk_create([
+                Album(title=f'Album {start + i}', cover_image='gallery/covers/bench.jpg',
+                      is_active=random.random() < 0.9)
+                for i in range(size)
+            ])
+
+            # auto_now_add stamps every row with "now"; spread batches over time so the
+            # ordering columns look like real data rather than one giant tie
+            created_at = now - timedelta(hours=rows // batch_size - start // batch_size)
+            for model in (BlogPost, Project, Resource, Album):
+                model.objects.filter(pk__gt=start, pk__lte=start + size).update(created_at=created_at)
+
+        # A few comments on every tenth post, and a 500-comment thread on the newest listed post
+        post_ids = list(BlogPost.objects.values_list('id', flat=True)[:rows // 10])
+        busy_post = BlogPost.objects.filter(is_published=True, is_approved=True).order_by('-id').first()
+        comments = [
+            BlogComment(post_id=post_id, author=random.choice(authors), content='Benchmark comment')
+            for post_id in post_ids for _ in range(3)
+        ]
+        comments += [
+            BlogComment(post=busy_post, author=random.choice(authors), content='Benchmark comment')
+            for _ in range(500)
+        ]
+        BlogComment.objects.bulk_create(comments, batch_size=batch_size)
+
+    def listings(self):
+        """(url, url of a later page given a cursor, queryset and ordering the view pages through)"""
+        category = ResourceCategory.objects.first()
+        posts = BlogPost.objects.filter(is_published=True, is_approved=True)
+        busy_post = posts.order_by('-id').first()
+        return [
+            ('/blog/', '/blog/?after={}', posts, ('-created_at', '-id')),
+            ('/projects/', '/projects/?after={}', Project.objects.filter(is_approved=True),
+             ('-created_at', '-id')),
+            ('/projects/?featured=1', '/projects/?featured=1&after={}',
+             Project.objects.filter(is_approved=True, is_featured=True), ('-created_at', '-id')),
+            ('/events/', '/events/?after={}', Event.objects.filter(is_active=True), ('-date', '-id')),
+            ('/events/?type=past', '/events/?type=past&after={}',
+             Event.objects.filter(is_active=True, event_type='past'), ('-date', '-id')),
+            ('/gallery/', '/gallery/?after={}', Album.objects.filter(is_active=True), ('-created_at', '-id')),
+            ('/resources/', '/resources/?after={}', Resource.objects.filter(is_active=True),
+             ('-created_at', '-id')),
+            (f'/resources/?type=notes&category={category.pk}',
+             f'/resources/?type=notes&category={category.pk}&after={{}}',
+             Resource.objects.filter(is_active=True, resource_type='notes', category=category),
+             ('-created_at', '-id')),
+            (f'/blog/{busy_post.pk}/', f'/blog/{busy_post.pk}/comments/?cursor={{}}',
+             BlogComment.objects.filter(post=busy_post), ('-created_at', '-id')),
+        ]
+
+    def benchmark(self, repeat):
+        client = Client()
+        for url, deep_url, queryset, ordering in self.listings():
+            ordered = queryset.order_by(*ordering)
+
+            # A cursor halfway down the listing, to show deep pages cost the same as the first
+            targets = [('first page', url)]
+            middle = ordered[ordered.count() // 2:].first()
+            if middle is not None:
+                cursor = encode_cursor([getattr(middle, name.lstrip('-')) for name in ordering])
+                targets.append(('middle page', deep_url.format(cursor)))
+
+            self.stdout.write(self.style.MIGRATE_HEADING(url))
+            for label, target in targets:
+                timings = []
+                for _ in range(repeat):
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        response = client.get(target)
+                        timings.append((time.perf_counter() - started) * 1000)
+                self.stdout.write(
+                    f'  {label}: HTTP {response.status_code}, {len(queries)} queries, '
+                    f'median {statistics.median(timings):.1f} ms'
+                )
+
+            self.stdout.write('  plan:')
+            for line in ordered[:10].explain().splitlines():
+                self.stdout.write(f'    {line}')
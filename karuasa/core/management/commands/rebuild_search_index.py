@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from core.search import rebuild_search_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the site search index from blog posts, projects, resources and events'
+
+    def handle(self, *args, **options):
+        counts = rebuild_search_index()
+        for label, count in counts.items():
+            self.stdout.write(f'{label}: {count} documents')
+        self.stdout.write(self.style.SUCCESS(f'Indexed {sum(counts.values())} documents'))
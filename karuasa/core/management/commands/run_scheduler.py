@@ -0,0 +1,32 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+from core.scheduler import claim_due_tasks, run_task, seconds_until_next_task, sync_scheduled_tasks
+
+
+class Command(BaseCommand):
+    help = 'Run the scheduled tasks in core.ScheduledTask as they fall due (long-running worker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-sleep', type=float, default=60,
+                            help='Longest wait, in seconds, before checking for due tasks again')
+        parser.add_argument('--once', action='store_true',
+                            help='Run every task that is currently due, then exit')
+
+    def handle(self, *args, **options):
+        sync_scheduled_tasks()
+        self.stdout.write('Scheduler started')
+        while True:
+            close_old_connections()
+            now = timezone.now()
+            for task in claim_due_tasks(now):
+                status, result = run_task(task, now)
+                if status == 'ok':
+                    self.stdout.write(self.style.SUCCESS(f'{task.name}: {result}'))
+                else:
+                    self.stdout.write(self.style.ERROR(f'{task.name} failed; see last_error in the admin'))
+
+            if options['once']:
+                break
+            time.sleep(seconds_until_next_task(timezone.now(), options['max_sleep']))
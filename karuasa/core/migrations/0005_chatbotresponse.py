@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:14
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_alter_leader_position'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatbotResponse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prompt_hash', models.CharField(max_length=64, unique=True)),
+                ('normalized_prompt', models.CharField(max_length=500)),
+                ('response', models.TextField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Chatbot Response',
+                'verbose_name_plural': 'Chatbot Responses',
+                'ordering': ['-last_used_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# External-content FTS5 table over core_searchdocument, kept in step by triggers.
+# prefix='2 3' adds prefix indexes so "act*" style queries don't scan the vocabulary.
+SQLITE_CREATE = [
+    """CREATE VIRTUAL TABLE core_searchdocument_fts USING fts5(
+        title, body, content='core_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER core_searchdocument_fts_ai AFTER INSERT ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+    """CREATE TRIGGER core_searchdocument_fts_ad AFTER DELETE ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END""",
+    """CREATE TRIGGER core_searchdocument_fts_au AFTER UPDATE ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO core_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS core_searchdocument_fts_au",
+    "DROP TRIGGER IF EXISTS core_searchdocument_fts_ad",
+    "DROP TRIGGER IF EXISTS core_searchdocument_fts_ai",
+    "DROP TABLE IF EXISTS core_searchdocument_fts",
+]
+MYSQL_CREATE = ["ALTER TABLE core_searchdocument ADD FULLTEXT INDEX core_searchdocument_ft (title, body)"]
+MYSQL_DROP = ["ALTER TABLE core_searchdocument DROP INDEX core_searchdocument_ft"]
+
+
+def _run(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_fulltext_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_CREATE, 'mysql': MYSQL_CREATE})
+
+
+def drop_fulltext_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_DROP, 'mysql': MYSQL_DROP})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0006_like'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.CharField(max_length=200)),
+                ('body', models.TextField(blank=True)),
+                ('url', models.CharField(max_length=200)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='searchdocument',
+            constraint=models.UniqueConstraint(fields=('content_type', 'object_id'), name='unique_search_document'),
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
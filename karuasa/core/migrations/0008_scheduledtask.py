@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:58
+
+import core.cron
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_searchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('task', models.CharField(max_length=200)),
+                ('schedule', models.CharField(help_text='Cron format: minute hour day month weekday, e.g. "0 * * * *" for hourly', max_length=100, validators=[core.cron.validate_cron])),
+                ('is_active', models.BooleanField(default=True)),
+                ('next_run_at', models.DateTimeField(blank=True, null=True)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+                ('last_status', models.CharField(blank=True, choices=[('ok', 'OK'), ('failed', 'Failed')], max_length=10)),
+                ('last_error', models.TextField(blank=True)),
+            ],
+            options={
+                'ordering': ['next_run_at'],
+            },
+        ),
+    ]
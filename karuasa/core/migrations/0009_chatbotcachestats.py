@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_scheduledtask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatbotCacheStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hits', models.PositiveBigIntegerField(default=0)),
+                ('misses', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Chatbot Cache Statistics',
+                'verbose_name_plural': 'Chatbot Cache Statistics',
+            },
+        ),
+    ]
@@ -1,5 +1,9 @@
+from django.conf import settings
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.utils import timezone
+from .cron import validate_cron
 
 class SiteInfo(models.Model):
     name = models.CharField(max_length=200)
@@ -114,4 +118,102 @@ class ContactMessage(models.Model):
         verbose_name_plural = 'Contact Messages'
     
     def __str__(self):
-        return f"{self.name} - {self.subject}"
\ No newline at end of file
+        return f"{self.name} - {self.subject}"
+
+class ChatbotResponse(models.Model):
+    """Cached chatbot answer, keyed by the normalized question"""
+    prompt_hash = models.CharField(max_length=64, unique=True)
+    normalized_prompt = models.CharField(max_length=500)
+    response = models.TextField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['-last_used_at']
+        verbose_name = 'Chatbot Response'
+        verbose_name_plural = 'Chatbot Responses'
+
+    def __str__(self):
+        return self.normalized_prompt[:80]
+
+
+class ChatbotCacheStats(models.Model):
+    """Hit/miss counters of the chatbot response cache: a single row, incremented with F()"""
+    hits = models.PositiveBigIntegerField(default=0)
+    misses = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Chatbot Cache Statistics'
+        verbose_name_plural = 'Chatbot Cache Statistics'
+
+    def __str__(self):
+        return f'{self.hits} hits, {self.misses} misses'
+
+
+class Like(models.Model):
+    """One member's like of a blog post, project, etc.; a member can like an object once"""
+    member = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='likes_given')
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['member', 'content_type', 'object_id'], name='unique_member_like'),
+        ]
+
+    def __str__(self):
+        return f"{self.member} likes {self.content_type.model} #{self.object_id}"
+
+
+class SearchDocument(models.Model):
+    """
+    Flattened, publicly visible copy of a blog post, project, resource or event for
+    site search. The full-text index over title and body lives outside the ORM
+    (FTS5 table on SQLite, FULLTEXT index on MySQL); see core/search.py.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+    title = models.CharField(max_length=200)
+    body = models.TextField(blank=True)
+    url = models.CharField(max_length=200)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id'], name='unique_search_document'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class ScheduledTask(models.Model):
+    """
+    A recurring job run by `manage.py run_scheduler`. `task` is the dotted path of a
+    function called as task(now=..., last_run_at=...). Entries are created from
+    settings.SCHEDULED_TASKS; schedules edited in the admin are kept.
+    """
+    STATUS_CHOICES = [
+        ('ok', 'OK'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100, unique=True)
+    task = models.CharField(max_length=200)
+    schedule = models.CharField(max_length=100, validators=[validate_cron],
+                                help_text='Cron format: minute hour day month weekday, e.g. "0 * * * *" for hourly')
+    is_active = models.BooleanField(default=True)
+    next_run_at = models.DateTimeField(null=True, blank=True)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    last_status = models.CharField(max_length=10, choices=STATUS_CHOICES, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['next_run_at']
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,165 @@
+import base64
+import hashlib
+import json
+from django.core.cache import cache
+from django.db.models import Q
+
+
+def encode_cursor(values):
+    """Pack the ordering values of a row into an opaque, URL-safe token"""
+    payload = json.dumps([v.isoformat() if hasattr(v, 'isoformat') else v for v in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, model, ordering):
+    """Unpack a token from encode_cursor, or return None if it is missing or malformed"""
+    if not token:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        if len(values) != len(ordering):
+            return None
+        return [
+            model._meta.get_field(name.lstrip('-')).to_python(value)
+            for name, value in zip(ordering, values)
+        ]
+    except Exception:
+        return None
+
+
+def _after(ordering, values):
+    """Q matching rows that sort strictly after `values` under `ordering`"""
+    condition = Q()
+    for index, name in enumerate(ordering):
+        field = name.lstrip('-')
+        lookup = 'lt' if name.startswith('-') else 'gt'
+        prefix = {ordering[i].lstrip('-'): values[i] for i in range(index)}
+        condition |= Q(**prefix, **{f'{field}__{lookup}': values[index]})
+    return condition
+
+
+def _reverse(ordering):
+    return [name[1:] if name.startswith('-') else f'-{name}' for name in ordering]
+
+
+class KeysetPage:
+    """
+    One page of a KeysetPaginator. Iterates like a list of objects and exposes
+    has_next/has_previous plus query strings for the next and previous links.
+    """
+
+    def __init__(self, object_list, paginator, params, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.params = params
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def _querystring(self, key, cursor):
+        params = self.params.copy()
+        for name in ('page', 'after', 'before'):
+            params.pop(name, None)
+        params[key] = cursor
+        return params.urlencode()
+
+    @property
+    def next_querystring(self):
+        return self._querystring('after', self.next_cursor)
+
+    @property
+    def previous_querystring(self):
+        return self._querystring('before', self.previous_cursor)
+
+    @property
+    def approximate_count(self):
+        return self.paginator.approximate_count()
+
+
+class KeysetPaginator:
+    """
+    Cursor-based replacement for django.core.paginator.Paginator.
+
+    Pages are fetched with an index-friendly WHERE on the ordering columns instead
+    of COUNT(*) plus OFFSET, so page 500 costs the same as page 1. The last field of
+    `ordering` must be unique (usually the primary key). Cursors are opaque tokens
+    passed as ?after= (next page) or ?before= (previous page).
+
+    Totals are optional: approximate_count() returns a COUNT(*) cached for
+    `count_timeout` seconds, or None when count_timeout is None.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id'), count_timeout=None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = list(ordering)
+        self.count_timeout = count_timeout
+
+    def page(self, after=None, before=None, params=None):
+        model = self.queryset.model
+        params = params.copy() if params is not None else {}
+        before_values = decode_cursor(before, model, self.ordering)
+
+        if before_values is not None:
+            # Walk backwards from the cursor, then flip the rows back into display order
+            rows = list(
+                self.queryset.order_by(*_reverse(self.ordering))
+                .filter(_after(_reverse(self.ordering), before_values))[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            has_next = True
+        else:
+            after_values = decode_cursor(after, model, self.ordering)
+            queryset = self.queryset.order_by(*self.ordering)
+            if after_values is not None:
+                queryset = queryset.filter(_after(self.ordering, after_values))
+            rows = list(queryset[:self.per_page + 1])
+            has_next = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_previous = after_values is not None
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_next:
+                next_cursor = self._cursor_for(rows[-1])
+            if has_previous:
+                previous_cursor = self._cursor_for(rows[0])
+        return KeysetPage(rows, self, params, next_cursor, previous_cursor)
+
+    def get_page(self, params):
+        """Build the page requested by a QueryDict such as request.GET"""
+        return self.page(after=params.get('after'), before=params.get('before'), params=params)
+
+    def _cursor_for(self, obj):
+        return encode_cursor([getattr(obj, name.lstrip('-')) for name in self.ordering])
+
+    def approximate_count(self):
+        if self.count_timeout is None:
+            return None
+        sql = str(self.queryset.order_by().query)
+        key = 'core:pagination:count:' + hashlib.md5(sql.encode()).hexdigest()
+        return cache.get_or_set(key, self.queryset.order_by().count, self.count_timeout)
+
+
+def cursor_page(queryset, cursor, per_page, ordering=('-created_at', '-id')):
+    """Return (items, next_cursor) for the page that starts after `cursor`"""
+    page = KeysetPaginator(queryset, per_page, ordering).page(after=cursor)
+    return page.object_list, page.next_cursor
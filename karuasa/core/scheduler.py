@@ -0,0 +1,60 @@
+import logging
+from django.conf import settings
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .cron import CronSchedule
+from .models import ScheduledTask
+
+logger = logging.getLogger(__name__)
+
+
+def sync_scheduled_tasks():
+    """
+    Create the entries in settings.SCHEDULED_TASKS that aren't in the database yet.
+    New entries are due straight away, so a fresh deployment catches up on startup.
+    """
+    for name, (task, schedule) in settings.SCHEDULED_TASKS.items():
+        ScheduledTask.objects.get_or_create(name=name, defaults={
+            'task': task, 'schedule': schedule, 'next_run_at': timezone.now(),
+        })
+
+
+def claim_due_tasks(now):
+    """
+    Move every due task's next_run_at on to its following slot and return the tasks
+    this process claimed. The conditional UPDATE means that with several schedulers
+    running, each slot is claimed by exactly one of them.
+    """
+    claimed = []
+    for task in ScheduledTask.objects.filter(is_active=True, next_run_at__lte=now):
+        next_run_at = CronSchedule(task.schedule).next_after(now)
+        if ScheduledTask.objects.filter(pk=task.pk, next_run_at=task.next_run_at).update(next_run_at=next_run_at):
+            claimed.append(task)
+
+    # New or rescheduled entries: wait for their next slot rather than running at once
+    for task in ScheduledTask.objects.filter(is_active=True, next_run_at__isnull=True):
+        ScheduledTask.objects.filter(pk=task.pk, next_run_at__isnull=True).update(
+            next_run_at=CronSchedule(task.schedule).next_after(now)
+        )
+    return claimed
+
+
+def run_task(task, now):
+    """Run one claimed task and record the outcome; returns (status, result)"""
+    try:
+        result = import_string(task.task)(now=now, last_run_at=task.last_run_at)
+        status, error = 'ok', ''
+    except Exception as e:
+        logger.exception('Scheduled task %s failed', task.name)
+        result, status, error = None, 'failed', str(e)
+    ScheduledTask.objects.filter(pk=task.pk).update(last_run_at=now, last_status=status, last_error=error)
+    return status, result
+
+
+def seconds_until_next_task(now, maximum):
+    """How long the scheduler can sleep before something is due, at most `maximum`"""
+    next_run_at = ScheduledTask.objects.filter(is_active=True).aggregate(Min('next_run_at'))['next_run_at__min']
+    if next_run_at is None:
+        return maximum
+    return min(maximum, max(0, (next_run_at - now).total_seconds()))
@@ -0,0 +1,206 @@
+import re
+from collections import namedtuple
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from blog.models import BlogPost
+from events.models import Event
+from projects.models import Project
+from resources.models import Resource
+from .models import SearchDocument
+
+# `visible` are the field values that make an object public; anything else is kept out of the index
+SearchSource = namedtuple('SearchSource', ['model', 'label', 'visible', 'url_name', 'body'])
+
+SEARCH_SOURCES = [
+    SearchSource(BlogPost, 'Blog', {'is_published': True, 'is_approved': True}, 'blog:post_detail',
+                 lambda post: post.content),
+    SearchSource(Project, 'Project', {'is_approved': True}, 'projects:project_detail',
+                 lambda project: project.description),
+    SearchSource(Resource, 'Resource', {'is_active': True}, 'resources:resource_detail',
+                 lambda resource: resource.description),
+    SearchSource(Event, 'Event', {'is_active': True}, 'events:event_detail',
+                 lambda event: f'{event.description}\n{event.location}'),
+]
+
+FTS_TABLE = 'core_searchdocument_fts'
+
+# Snippet highlight markers; control characters survive escaping and can't come from a query
+MARK_START, MARK_END = '\x02', '\x03'
+
+
+def get_source(model):
+    for source in SEARCH_SOURCES:
+        if source.model is model:
+            return source
+    return None
+
+
+def _document(source, obj):
+    return {
+        'title': obj.title[:200],
+        'body': source.body(obj),
+        'url': reverse(source.url_name, args=[obj.pk]),
+    }
+
+
+def _is_visible(source, obj):
+    return all(getattr(obj, field) == value for field, value in source.visible.items())
+
+
+def index_object(sender, instance, **kwargs):
+    """post_save handler: (re)index a public object, drop a hidden one from the index"""
+    source = get_source(sender)
+    content_type = ContentType.objects.get_for_model(sender)
+    if _is_visible(source, instance):
+        SearchDocument.objects.update_or_create(
+            content_type=content_type, object_id=instance.pk, defaults=_document(source, instance)
+        )
+    else:
+        SearchDocument.objects.filter(content_type=content_type, object_id=instance.pk).delete()
+
+
+def remove_object(sender, instance, **kwargs):
+    """post_delete handler"""
+    content_type = ContentType.objects.get_for_model(sender)
+    SearchDocument.objects.filter(content_type=content_type, object_id=instance.pk).delete()
+
+
+@transaction.atomic
+def reindex(queryset, batch_size=500):
+    """
+    Re-sync the index for every object in `queryset`. Needed after queryset.update(),
+    e.g. in admin bulk actions, which doesn't send post_save. Returns the number indexed.
+    """
+    source = get_source(queryset.model)
+    content_type = ContentType.objects.get_for_model(queryset.model)
+    pks = list(queryset.values_list('pk', flat=True))
+    SearchDocument.objects.filter(content_type=content_type, object_id__in=pks).delete()
+
+    documents = [
+        SearchDocument(content_type=content_type, object_id=obj.pk, **_document(source, obj))
+        for obj in queryset.model.objects.filter(pk__in=pks, **source.visible)
+    ]
+    SearchDocument.objects.bulk_create(documents, batch_size=batch_size)
+    return len(documents)
+
+
+def rebuild_search_index():
+    """Rebuild the whole index from the source tables; returns {label: documents indexed}"""
+    counts = {}
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        for source in SEARCH_SOURCES:
+            counts[source.label] = reindex(source.model.objects.all())
+    return counts
+
+
+def _tokens(query):
+    # Single letters add little but cost a lot, so they are only kept when they are the whole query
+    tokens = re.findall(r'\w+', query.lower())[:8]
+    return [token for token in tokens if len(token) > 1] or tokens[:1]
+
+
+def _highlight(text, tokens, words=30):
+    """
+    Mark query terms in `text` and cut a window of about `words` words around the
+    first match. Used where the database can't build snippets itself.
+    """
+    pattern = re.compile(r'\b(' + '|'.join(re.escape(t) for t in tokens) + r')\w*', re.IGNORECASE)
+    parts = text.split()
+    first = next((i for i, part in enumerate(parts) if pattern.search(part)), 0)
+    start = max(0, first - words // 3)
+    window = ' '.join(parts[start:start + words])
+    window = pattern.sub(lambda m: f'{MARK_START}{m.group(0)}{MARK_END}', window)
+    prefix = '…' if start else ''
+    suffix = '…' if start + words < len(parts) else ''
+    return f'{prefix}{window}{suffix}'
+
+
+def _render(marked):
+    return mark_safe(escape(marked).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>'))
+
+
+def _search_sqlite(tokens, limit):
+    # Every term must match; the quotes stop FTS5 reading terms as operators. A one-letter
+    # prefix would rank most of the table, so single letters only match whole words.
+    match = ' '.join(f'"{token}"*' if len(token) > 1 else f'"{token}"' for token in tokens)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT d.content_type_id, d.url,
+                   highlight({FTS_TABLE}, 0, %s, %s),
+                   snippet({FTS_TABLE}, 1, %s, %s, '…', 24),
+                   bm25({FTS_TABLE}, 5.0, 1.0) AS score
+            FROM {FTS_TABLE}
+            JOIN core_searchdocument d ON d.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH %s
+            ORDER BY score
+            LIMIT %s
+            """,
+            [MARK_START, MARK_END, MARK_START, MARK_END, match, limit],
+        )
+        return [(content_type_id, url, title, snippet, -score)
+                for content_type_id, url, title, snippet, score in cursor.fetchall()]
+
+
+def _search_mysql(tokens, limit):
+    against = ' '.join(f'+{token}*' for token in tokens)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT content_type_id, url, title, body,
+                   MATCH(title, body) AGAINST (%s IN BOOLEAN MODE) AS score
+            FROM core_searchdocument
+            WHERE MATCH(title, body) AGAINST (%s IN BOOLEAN MODE)
+            ORDER BY score DESC
+            LIMIT %s
+            """,
+            [against, against, limit],
+        )
+        return [(content_type_id, url, _highlight(title, tokens, 50), _highlight(body, tokens), score)
+                for content_type_id, url, title, body, score in cursor.fetchall()]
+
+
+def _search_fallback(tokens, limit):
+    """LIKE-based search for backends without a full-text index, newest first"""
+    documents = SearchDocument.objects.all()
+    for token in tokens:
+        documents = documents.filter(Q(title__icontains=token) | Q(body__icontains=token))
+    return [(doc.content_type_id, doc.url, _highlight(doc.title, tokens, 50), _highlight(doc.body, tokens), 0)
+            for doc in documents.order_by('-updated_at')[:limit]]
+
+
+def search_documents(query, limit=20):
+    """
+    Ranked site search over public blog posts, projects, resources and events.
+
+    Every word must match, as a whole word or a prefix. Returns dicts with label,
+    url, title and snippet; title and snippet are safe HTML with matches in <mark>.
+    """
+    tokens = _tokens(query)
+    if not tokens:
+        return []
+
+    if connection.vendor == 'sqlite':
+        rows = _search_sqlite(tokens, limit)
+    elif connection.vendor == 'mysql':
+        rows = _search_mysql(tokens, limit)
+    else:
+        rows = _search_fallback(tokens, limit)
+
+    content_types = ContentType.objects.get_for_models(*[source.model for source in SEARCH_SOURCES])
+    labels = {content_types[source.model].id: source.label for source in SEARCH_SOURCES}
+    return [
+        {
+            'label': labels.get(content_type_id, ''),
+            'url': url,
+            'title': _render(title),
+            'snippet': _render(snippet),
+            'score': score,
+        }
+        for content_type_id, url, title, snippet, score in rows
+    ]
@@ -0,0 +1,278 @@
+# core/services.py
+import asyncio
+import hashlib
+import json
+import math
+import re
+from collections import Counter
+from datetime import timedelta
+import httpx
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import ChatbotCacheStats, ChatbotResponse
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/models"
+
+GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "topK": 40,
+    "topP": 0.95,
+    "maxOutputTokens": 1024,
+}
+
+# One pooled client and concurrency gate per event loop. Under uvicorn that is one
+# per worker; the dev server runs each async view in a fresh loop.
+_clients = {}
+
+
+def build_chatbot_prompt(user_message):
+    """Wrap the user's question in the KARUASA assistant instructions"""
+    return f"""You are KARUASA Assistant, a helpful AI for the Karatina University Actuarial Students Association.
+
+About KARUASA: We are the Karatina University Actuarial Students Association, dedicated to empowering future actuaries through excellence and innovation.
+
+Your expertise covers:
+- Actuarial science concepts, principles, and methodologies
+- Professional actuarial exams (SOA, CAS, IFoA)
+- Programming for actuaries (Python, R, SQL, Excel)
+- Mathematics, statistics, and probability
+- Economics, finance, and risk management
+- Career guidance in the actuarial field
+- Study tips, resources, and exam preparation strategies
+- Professional development and networking
+- Motivational support for actuarial students
+
+Important guidelines:
+- Be encouraging, professional, and supportive
+- Provide accurate, practical information
+- Focus on educational value
+- Keep responses clear and concise
+- If you don't know something, admit it and suggest resources
+- Always maintain a positive and helpful tone
+
+User question: {user_message}
+
+Please provide a helpful response that would benefit actuarial students."""
+
+
+def _get_client():
+    """Return the keep-alive client and semaphore bound to the running event loop"""
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(loop)
+    if entry is None:
+        # Forget clients whose loops have finished (dev server, tests)
+        for old_loop in [l for l in _clients if l.is_closed()]:
+            del _clients[old_loop]
+
+        client = httpx.AsyncClient(
+            base_url=GEMINI_BASE_URL,
+            timeout=httpx.Timeout(settings.GEMINI_CHAT_TIMEOUT, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=settings.GEMINI_CHAT_MAX_CONCURRENCY,
+                max_keepalive_connections=settings.GEMINI_CHAT_MAX_CONCURRENCY,
+            ),
+            headers={'Content-Type': 'application/json'},
+        )
+        entry = _clients[loop] = (client, asyncio.Semaphore(settings.GEMINI_CHAT_MAX_CONCURRENCY))
+    return entry
+
+
+def extract_text(data):
+    """Pull the reply text out of a generateContent payload, or None if it is malformed"""
+    try:
+        return data['candidates'][0]['content']['parts'][0]['text']
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+async def generate_chatbot_reply(user_message):
+    """
+    Ask Gemini for a reply without blocking the worker.
+
+    Raises httpx.TimeoutException / httpx.HTTPError on transport or status errors
+    and returns None when the response body has an unexpected shape.
+    """
+    client, semaphore = _get_client()
+    payload = {
+        "contents": [{"parts": [{"text": build_chatbot_prompt(user_message)}]}],
+        "generationConfig": GENERATION_CONFIG,
+    }
+
+    async with semaphore:
+        response = await client.post(
+            f"/{settings.GEMINI_CHAT_MODEL}:generateContent",
+            params={'key': settings.GEMINI_API_KEY},
+            json=payload,
+        )
+    response.raise_for_status()
+
+    data = response.json()
+    text = extract_text(data)
+    if text is None:
+        print(f"Unexpected response structure: {data}")
+    return text
+
+
+async def stream_chatbot_reply(user_message):
+    """
+    Yield reply text chunks as Gemini produces them via streamGenerateContent.
+
+    The concurrency slot is held until the stream finishes. Raises the same
+    httpx errors as generate_chatbot_reply.
+    """
+    client, semaphore = _get_client()
+    payload = {
+        "contents": [{"parts": [{"text": build_chatbot_prompt(user_message)}]}],
+        "generationConfig": GENERATION_CONFIG,
+    }
+
+    async with semaphore:
+        async with client.stream(
+            'POST',
+            f"/{settings.GEMINI_CHAT_MODEL}:streamGenerateContent",
+            params={'key': settings.GEMINI_API_KEY, 'alt': 'sse'},
+            json=payload,
+        ) as response:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+
+            async for line in response.aiter_lines():
+                if not line.startswith('data:'):
+                    continue
+                try:
+                    text = extract_text(json.loads(line[5:]))
+                except ValueError:
+                    continue
+                if text:
+                    yield text
+
+
+# ---------------------------------------------------------------------------
+# Response cache for repeated chatbot questions
+# ---------------------------------------------------------------------------
+
+# How many of the question's longest words an entry must share one of to be scored
+CHATBOT_CACHE_CANDIDATE_WORDS = 3
+
+
+def normalize_prompt(text):
+    """Lowercase, drop punctuation and collapse whitespace so trivial variations share a key"""
+    text = re.sub(r'[^\w\s]', ' ', text.lower())
+    return ' '.join(text.split())[:500]
+
+
+def _prompt_hash(normalized):
+    return hashlib.sha256(f"{settings.GEMINI_CHAT_MODEL}:{normalized}".encode()).hexdigest()
+
+
+def _tfidf_similarity(query_tokens, candidates):
+    """
+    Return (entry, score) for the candidate closest to the query by TF-IDF cosine similarity.
+    IDF weights come from the candidate set itself, so common words like "how" or "the"
+    count for little and exam codes like "cs1" count for a lot.
+    """
+    documents = [(entry, Counter(entry.normalized_prompt.split())) for entry in candidates]
+    total = len(documents) + 1
+    document_frequency = Counter(query_tokens.keys())
+    for _, tokens in documents:
+        document_frequency.update(tokens.keys())
+
+    def vector(tokens):
+        return {t: count * (math.log(total / document_frequency[t]) + 1) for t, count in tokens.items()}
+
+    def norm(v):
+        return math.sqrt(sum(w * w for w in v.values()))
+
+    query_vector = vector(query_tokens)
+    query_norm = norm(query_vector)
+    best, best_score = None, 0.0
+    for entry, tokens in documents:
+        doc_vector = vector(tokens)
+        denominator = query_norm * norm(doc_vector)
+        if not denominator:
+            continue
+        score = sum(w * doc_vector.get(t, 0.0) for t, w in query_vector.items()) / denominator
+        if score > best_score:
+            best, best_score = entry, score
+    return best, best_score
+
+
+def _record(counter):
+    """Add one to the 'hits' or 'misses' counter in the database, so no worker's update is lost"""
+    if not ChatbotCacheStats.objects.filter(pk=1).update(**{counter: F(counter) + 1}):
+        ChatbotCacheStats.objects.get_or_create(pk=1)
+        ChatbotCacheStats.objects.filter(pk=1).update(**{counter: F(counter) + 1})
+
+
+def get_chatbot_cache_stats():
+    """Hit/miss counters shared by all worker processes"""
+    stats = ChatbotCacheStats.objects.filter(pk=1).values('hits', 'misses').first()
+    return stats or {'hits': 0, 'misses': 0}
+
+
+def reset_chatbot_cache_stats():
+    ChatbotCacheStats.objects.filter(pk=1).update(hits=0, misses=0)
+
+
+def _candidate_filter(tokens):
+    """
+    Entries containing one of the question's longest words. Long words are the rare,
+    heavily weighted ones: an entry sharing none of them scores far below the
+    similarity threshold, so only the entries matched here are loaded and scored.
+    """
+    words = sorted(set(tokens), key=len, reverse=True)[:CHATBOT_CACHE_CANDIDATE_WORDS]
+    condition = Q()
+    for word in words:
+        condition |= Q(normalized_prompt__contains=word)
+    return condition
+
+
+def lookup_cached_reply(user_message):
+    """Return a cached reply for this question (or a near-identical one), or None"""
+    normalized = normalize_prompt(user_message)
+    fresh = ChatbotResponse.objects.filter(
+        created_at__gte=timezone.now() - timedelta(seconds=settings.CHATBOT_CACHE_TTL)
+    )
+
+    entry = fresh.filter(prompt_hash=_prompt_hash(normalized)).first()
+    tokens = normalized.split()
+    if entry is None and tokens and settings.CHATBOT_CACHE_SIMILARITY < 1:
+        candidates = (fresh.filter(_candidate_filter(tokens))
+                      .only('id', 'normalized_prompt')[:settings.CHATBOT_CACHE_MAX_ENTRIES])
+        match, score = _tfidf_similarity(Counter(tokens), candidates)
+        if match is not None and score >= settings.CHATBOT_CACHE_SIMILARITY:
+            entry = ChatbotResponse.objects.filter(pk=match.pk).first()
+
+    if entry is None:
+        _record('misses')
+        return None
+
+    ChatbotResponse.objects.filter(pk=entry.pk).update(hits=F('hits') + 1, last_used_at=timezone.now())
+    _record('hits')
+    return entry.response
+
+
+def store_cached_reply(user_message, reply):
+    """Cache a reply, then evict expired entries and the least recently used overflow"""
+    normalized = normalize_prompt(user_message)
+    ChatbotResponse.objects.update_or_create(
+        prompt_hash=_prompt_hash(normalized),
+        defaults={
+            'normalized_prompt': normalized,
+            'response': reply,
+            'created_at': timezone.now(),
+            'last_used_at': timezone.now(),
+        },
+    )
+
+    ChatbotResponse.objects.filter(
+        created_at__lt=timezone.now() - timedelta(seconds=settings.CHATBOT_CACHE_TTL)
+    ).delete()
+    # MySQL can't DELETE with a LIMIT subquery, so collect the ids first
+    overflow = list(
+        ChatbotResponse.objects.values_list('id', flat=True)[settings.CHATBOT_CACHE_MAX_ENTRIES:]
+    )
+    if overflow:
+        ChatbotResponse.objects.filter(id__in=overflow).delete()
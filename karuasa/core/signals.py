@@ -0,0 +1,52 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from .models import SiteInfo, SliderImage, Partner, Testimonial
+from .context_processors import clear_site_info
+from .images import generate_variants_on_save, mark_new_uploads
+from .search import SEARCH_SOURCES, index_object, remove_object
+from events.models import Event
+from projects.models import Project
+
+# Cache key for the fully rendered home page served to anonymous visitors
+HOME_PAGE_CACHE_KEY = 'core:home:page'
+
+# Names of the {% cache %} fragments in home.html
+HOME_FRAGMENTS = ['home_sliders', 'home_projects', 'home_partners', 'home_testimonials']
+
+
+def clear_home_cache(**kwargs):
+    """
+    Drop the cached home page and all of its section fragments. Deferred to commit,
+    so a visit before the change is committed can't cache the old content again.
+    """
+    keys = [HOME_PAGE_CACHE_KEY] + [make_template_fragment_key(name) for name in HOME_FRAGMENTS]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+# SiteInfo is included because the footer of the cached page shows the contact details
+for model in (SiteInfo, SliderImage, Partner, Testimonial, Event, Project):
+    post_save.connect(clear_home_cache, sender=model, dispatch_uid=f'clear_home_cache_save_{model.__name__}')
+    post_delete.connect(clear_home_cache, sender=model, dispatch_uid=f'clear_home_cache_delete_{model.__name__}')
+
+# Featured project cards list their members
+m2m_changed.connect(clear_home_cache, sender=Project.members.through, dispatch_uid='clear_home_cache_project_members')
+
+# Saving SiteInfo (e.g. through SiteInfoAdmin) invalidates the memoized copy in every process
+post_save.connect(clear_site_info, sender=SiteInfo, dispatch_uid='clear_site_info_save')
+post_delete.connect(clear_site_info, sender=SiteInfo, dispatch_uid='clear_site_info_delete')
+
+# Keep the site search index in step with the searchable models
+for source in SEARCH_SOURCES:
+    name = source.model.__name__
+    post_save.connect(index_object, sender=source.model, dispatch_uid=f'search_index_save_{name}')
+    post_delete.connect(remove_object, sender=source.model, dispatch_uid=f'search_index_delete_{name}')
+
+# Resized copies of uploaded images are built as soon as the upload is saved
+for label in settings.IMAGE_VARIANT_FIELDS:
+    model = apps.get_model(label)
+    pre_save.connect(mark_new_uploads, sender=model, dispatch_uid=f'image_uploads_{label}')
+    post_save.connect(generate_variants_on_save, sender=model, dispatch_uid=f'image_variants_{label}')
@@ -0,0 +1,36 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
+from core.images import MIME_TYPES, variant_formats, variant_srcset, variant_url
+
+register = template.Library()
+
+@register.filter
+def thumbnail(field_file, width):
+    """URL of a resized WebP copy of an uploaded image: {{ photo.image|thumbnail:400 }}"""
+    return variant_url(field_file, int(width))
+
+@register.simple_tag
+def srcset(field_file, fmt='webp'):
+    """srcset value with every resized copy of an uploaded image"""
+    return variant_srcset(field_file, fmt)
+
+@register.simple_tag
+def responsive_image(field_file, sizes='100vw', loading='lazy', **attrs):
+    """
+    <picture> with a resized source per configured format and the original upload as
+    fallback, e.g. {% responsive_image post.featured_image sizes="(min-width: 992px) 33vw, 100vw" alt=post.title class="card-img-top" %}
+    """
+    if not field_file:
+        return ''
+    # Best-compressed format first; the browser takes the first source it supports
+    sources = [
+        (MIME_TYPES[fmt], variant_srcset(field_file, fmt), sizes)
+        for fmt in sorted(variant_formats(), key=['avif', 'webp', 'jpeg'].index)
+    ]
+    return format_html(
+        '<picture>{}<img src="{}"{}></picture>',
+        format_html_join('', '<source type="{}" srcset="{}" sizes="{}">', [s for s in sources if s[1]]),
+        field_file.url,
+        flatatt({'loading': loading, 'decoding': 'async', **attrs}),
+    )
@@ -1,3 +1,472 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from io import BytesIO
+from unittest import mock
+import httpx
+from PIL import Image
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from blog.models import BlogPost
+from members.models import Member
+from .cache import SampledCullFileBasedCache
+from .cron import CronSchedule, validate_cron
+from .images import generate_variants, variant_name
+from .likes import LikeBloomFilter, like_object, liked_ids
+from .models import ChatbotCacheStats, ChatbotResponse, Like, ScheduledTask
+from .pagination import KeysetPaginator
+from .scheduler import claim_due_tasks
+from .search import search_documents
+from .services import (get_chatbot_cache_stats, lookup_cached_reply, reset_chatbot_cache_stats,
+                       store_cached_reply)
 
-# Create your tests here.
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def local(*args):
+    """An aware datetime in the site's time zone"""
+    return timezone.make_aware(datetime(*args))
+
+
+class CronScheduleTests(SimpleTestCase):
+
+    def assertNextAfter(self, expression, moment, expected):
+        self.assertEqual(CronSchedule(expression).next_after(moment), expected)
+
+    def test_steps_and_ranges(self):
+        self.assertNextAfter('*/15 * * * *', local(2026, 11, 2, 10, 7), local(2026, 11, 2, 10, 15))
+        self.assertNextAfter('0-30/10 8 * * *', local(2026, 11, 2, 8, 25), local(2026, 11, 2, 8, 30))
+        self.assertNextAfter('0-30/10 8 * * *', local(2026, 11, 2, 8, 31), local(2026, 11, 3, 8, 0))
+
+    def test_result_is_strictly_after(self):
+        self.assertNextAfter('*/15 * * * *', local(2026, 11, 2, 10, 15), local(2026, 11, 2, 10, 30))
+        self.assertNextAfter('0 * * * *', local(2026, 11, 2, 10, 0, 30), local(2026, 11, 2, 11, 0))
+
+    def test_rolls_over_months_and_years(self):
+        self.assertNextAfter('0 0 1 * *', local(2026, 12, 15, 12, 0), local(2027, 1, 1, 0, 0))
+        self.assertNextAfter('30 6 31 * *', local(2026, 11, 2, 0, 0), local(2026, 12, 31, 6, 30))
+
+    def test_weekdays(self):
+        # 2026-11-06 is a Friday
+        self.assertNextAfter('0 9 * * 1-5', local(2026, 11, 6, 17, 0), local(2026, 11, 9, 9, 0))
+        self.assertNextAfter('0 0 * * 7', local(2026, 11, 6, 17, 0), local(2026, 11, 8, 0, 0))
+        self.assertNextAfter('0 0 * * 0', local(2026, 11, 6, 17, 0), local(2026, 11, 8, 0, 0))
+
+    def test_day_and_weekday_match_either(self):
+        # The 1st of the month or any Friday, whichever comes first
+        self.assertNextAfter('0 9 1 * 5', local(2026, 11, 2, 10, 0), local(2026, 11, 6, 9, 0))
+        self.assertNextAfter('0 9 1 * 5', local(2026, 11, 27, 10, 0), local(2026, 12, 1, 9, 0))
+
+    def test_invalid_expressions_are_rejected(self):
+        for expression in ['* * * *', '60 * * * *', '0 24 * * *', 'a * * * *', '*/0 * * * *', '5-1 * * * *']:
+            with self.subTest(expression=expression):
+                with self.assertRaises(ValueError):
+                    CronSchedule(expression)
+        with self.assertRaises(ValidationError):
+            validate_cron('0 0 30 2 *')  # valid fields, but February never has a 30th
+
+
+class SampledCullFileBasedCacheTests(SimpleTestCase):
+    """The file cache still culls past MAX_ENTRIES, but only counts its files on some writes"""
+
+    def make_cache(self, interval):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        return SampledCullFileBasedCache(directory, {
+            'OPTIONS': {'MAX_ENTRIES': 30, 'CULL_FREQUENCY': 3, 'CULL_CHECK_INTERVAL': interval},
+        }), directory
+
+    def test_culls_when_checking_every_write(self):
+        cache, directory = self.make_cache(1)
+        for i in range(60):
+            cache.set(f'key{i}', i, None)
+        self.assertLessEqual(len(os.listdir(directory)), 31)
+
+    def test_skips_the_count_between_checks(self):
+        cache, directory = self.make_cache(100)
+        with mock.patch('core.cache.random.randrange', return_value=1), \
+                mock.patch.object(SampledCullFileBasedCache, '_list_cache_files') as list_files:
+            for i in range(60):
+                cache.set(f'key{i}', i, None)
+        list_files.assert_not_called()
+        self.assertEqual(len(os.listdir(directory)), 60)
+
+
+@override_settings(CACHES=TEST_CACHES, CHATBOT_CACHE_SIMILARITY=0.5)
+class ChatbotCacheTests(TestCase):
+    """Similar questions hit the cache; hits and misses are counted in the database"""
+
+    def setUp(self):
+        store_cached_reply('How is an annuity valued?', 'With the present value of its payments.')
+        store_cached_reply('When is the CS1 exam?', 'In April and September.')
+
+    def test_similar_question_is_a_hit(self):
+        self.assertEqual(lookup_cached_reply('How is an annuity valued today?'),
+                         'With the present value of its payments.')
+        self.assertIsNone(lookup_cached_reply('Who runs the mentorship programme?'))
+        self.assertEqual(get_chatbot_cache_stats(), {'hits': 1, 'misses': 1})
+
+    def test_only_entries_sharing_a_long_word_are_scored(self):
+        with mock.patch('core.services._tfidf_similarity', return_value=(None, 0.0)) as similarity:
+            lookup_cached_reply('How is an annuity valued today?')
+        scored = [entry.normalized_prompt for entry in similarity.call_args.args[1]]
+        self.assertEqual(scored, ['how is an annuity valued'])
+
+    def test_counters_are_kept_in_the_database(self):
+        lookup_cached_reply('Who runs the mentorship programme?')
+        ChatbotCacheStats.objects.filter(pk=1).update(hits=5)
+        cache.clear()
+        self.assertEqual(get_chatbot_cache_stats(), {'hits': 5, 'misses': 1})
+
+        reset_chatbot_cache_stats()
+        self.assertEqual(get_chatbot_cache_stats(), {'hits': 0, 'misses': 0})
+
+
+def png(width, height):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'teal').save(buffer, 'PNG')
+    return SimpleUploadedFile('photo.png', buffer.getvalue(), content_type='image/png')
+
+
+class ImageVariantTests(TestCase):
+    """Derivatives are built once per upload; later saves and cache misses don't redo the work"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, CACHES=TEST_CACHES,
+                                              IMAGE_VARIANT_WIDTHS=[200, 400], IMAGE_VARIANT_FORMATS=['jpeg'])
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cache.clear()
+        self.member = Member.objects.create(username='pictured', registration_number='PIC1')
+
+    def test_upload_generates_variants(self):
+        self.member.profile_picture = png(600, 400)
+        self.member.save()
+        name = self.member.profile_picture.name
+        for width in (200, 400):
+            self.assertTrue(default_storage.exists(variant_name(name, width, 'jpeg')))
+
+    def test_stored_variants_are_reused_after_a_cache_clear(self):
+        self.member.profile_picture = png(600, 400)
+        self.member.save()
+        urls = generate_variants(self.member.profile_picture)
+
+        cache.clear()
+        with mock.patch('core.images.Image.open') as open_image:
+            self.assertEqual(generate_variants(self.member.profile_picture), urls)
+        open_image.assert_not_called()
+
+    def test_saves_without_a_new_upload_skip_generation(self):
+        self.member.profile_picture = png(600, 400)
+        self.member.save()
+        with mock.patch('core.images.generate_variants') as generate:
+            self.member.last_login = timezone.now()
+            self.member.save(update_fields=['last_login'])
+            self.member.save()
+            Member.objects.get(pk=self.member.pk).save()
+        generate.assert_not_called()
+
+
+class ClaimDueTasksTests(TestCase):
+    """Each slot of a task must be claimed once, however many schedulers are running"""
+
+    def setUp(self):
+        self.now = local(2026, 11, 2, 10, 7)
+        self.task = ScheduledTask.objects.create(
+            name='every-five-minutes', task='dashboard.services.rotate_competitions',
+            schedule='*/5 * * * *', next_run_at=local(2026, 11, 2, 10, 5),
+        )
+
+    def test_due_task_is_claimed_once_per_slot(self):
+        self.assertEqual([task.pk for task in claim_due_tasks(self.now)], [self.task.pk])
+        self.assertEqual(claim_due_tasks(self.now), [])
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.next_run_at, local(2026, 11, 2, 10, 10))
+        self.assertEqual(len(claim_due_tasks(self.now + timedelta(minutes=3))), 1)
+
+    def test_losing_a_race_skips_the_task(self):
+        real_next_after = CronSchedule.next_after
+
+        def claimed_elsewhere(schedule, moment):
+            # Another scheduler claims the slot between this one's read and its UPDATE
+            ScheduledTask.objects.filter(pk=self.task.pk).update(next_run_at=local(2026, 11, 2, 10, 10))
+            return real_next_after(schedule, moment)
+
+        with mock.patch.object(CronSchedule, 'next_after', claimed_elsewhere):
+            self.assertEqual(claim_due_tasks(self.now), [])
+
+    def test_new_task_waits_for_its_first_slot(self):
+        ScheduledTask.objects.filter(pk=self.task.pk).update(next_run_at=None)
+
+        self.assertEqual(claim_due_tasks(self.now), [])
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.next_run_at, local(2026, 11, 2, 10, 10))
+
+    def test_inactive_task_is_not_claimed(self):
+        ScheduledTask.objects.filter(pk=self.task.pk).update(is_active=False)
+        self.assertEqual(claim_due_tasks(self.now), [])
+
+
+@override_settings(CACHES=TEST_CACHES, GEMINI_API_KEY='test-key')
+class ChatbotApiTests(TestCase):
+    """The async chatbot endpoints accept POSTs only and answer repeat questions from the cache"""
+
+    def post(self, message):
+        return self.client.post(reverse('chatbot_api'), {'message': message})
+
+    def test_get_is_not_allowed(self):
+        for name in ('chatbot_api', 'chatbot_stream'):
+            response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 405)
+            self.assertEqual(response['Allow'], 'POST')
+
+    def test_post_needs_no_csrf_token(self):
+        # The widget posts without a token, as it did before the view became async
+        self.client = self.client_class(enforce_csrf_checks=True)
+        with mock.patch('core.views.generate_chatbot_reply', mock.AsyncMock(return_value='Hello')):
+            response = self.post('Hi there')
+        self.assertEqual(response.status_code, 200)
+
+    def test_empty_message_is_rejected(self):
+        self.assertEqual(self.post('   ').status_code, 400)
+        response = self.client.post(reverse('chatbot_stream'), {'message': ''})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(GEMINI_API_KEY='')
+    def test_without_api_key(self):
+        with mock.patch('core.views.generate_chatbot_reply', mock.AsyncMock()) as generate:
+            response = self.post('What is an annuity?')
+        self.assertIn('being configured', response.json()['response'])
+        generate.assert_not_called()
+
+    def test_repeat_question_is_served_from_cache(self):
+        reply = mock.AsyncMock(return_value='An annuity is a series of payments.')
+        with mock.patch('core.views.generate_chatbot_reply', reply):
+            first = self.post('What is an annuity?').json()
+            second = self.post('what is an ANNUITY').json()
+
+        self.assertEqual(reply.await_count, 1)
+        self.assertNotIn('cached', first)
+        self.assertEqual(second, {'response': 'An annuity is a series of payments.', 'cached': True})
+        self.assertEqual(ChatbotResponse.objects.count(), 1)
+
+    def test_upstream_timeout_gets_a_friendly_reply(self):
+        with mock.patch('core.views.generate_chatbot_reply', mock.AsyncMock(side_effect=httpx.ReadTimeout('slow'))):
+            response = self.post('What is an annuity?')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('timed out', response.json()['response'])
+        self.assertFalse(ChatbotResponse.objects.exists())
+
+    async def test_stream_relays_chunks_then_done(self):
+        async def chunks(message):
+            for text in ('An annuity ', 'is a series ', 'of payments.'):
+                yield text
+
+        with mock.patch('core.views.stream_chatbot_reply', chunks):
+            response = await self.async_client.post(reverse('chatbot_stream'), {'message': 'What is an annuity?'})
+            body = ''.join([chunk.decode() async for chunk in response.streaming_content])
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        frames = body.strip().split('\n\n')
+        self.assertEqual([json.loads(frame[len('data: '):])['text'] for frame in frames[:-1]],
+                         ['An annuity ', 'is a series ', 'of payments.'])
+        self.assertTrue(frames[-1].startswith('event: done'))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class LikeTests(TestCase):
+    """A member counts once per object, and liked-state for a page of cards costs at most two queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = Member.objects.create(username='fan', registration_number='FAN1')
+        cls.posts = [
+            BlogPost.objects.create(title=f'Post {i}', content='-', author=cls.member,
+                                    is_published=True, is_approved=True)
+            for i in range(50)
+        ]
+
+    def like(self, post):
+        with self.captureOnCommitCallbacks(execute=True):
+            return like_object(self.member, BlogPost, post.pk)
+
+    def test_like_is_counted_once_per_member(self):
+        self.assertEqual(self.like(self.posts[0]), (1, True))
+        self.assertEqual(self.like(self.posts[0]), (1, False))
+        self.assertEqual(Like.objects.count(), 1)
+        self.posts[0].refresh_from_db()
+        self.assertEqual(self.posts[0].likes, 1)
+
+    def test_liking_a_missing_object_records_nothing(self):
+        self.assertEqual(like_object(self.member, BlogPost, 0), (None, False))
+        self.assertFalse(Like.objects.exists())
+
+    def test_liked_state_for_a_page_of_cards(self):
+        for post in self.posts[:3]:
+            self.like(post)
+        ids = [post.pk for post in self.posts]
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(liked_ids(self.member, BlogPost, ids), {post.pk for post in self.posts[:3]})
+        self.assertLessEqual(len(queries), 2)  # build the filter, confirm the candidates
+
+        with CaptureQueriesContext(connection) as queries:
+            liked_ids(self.member, BlogPost, ids)
+        self.assertLessEqual(len(queries), 1)  # the filter is cached now
+
+    def test_a_new_like_shows_up_straight_away(self):
+        self.assertEqual(liked_ids(self.member, BlogPost, [self.posts[0].pk]), set())
+        self.like(self.posts[0])
+        self.assertEqual(liked_ids(self.member, BlogPost, [self.posts[0].pk]), {self.posts[0].pk})
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = LikeBloomFilter(500)
+        keys = [f'7:{pk}' for pk in range(500)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(f'8:{pk}' in bloom for pk in range(5000))
+        self.assertLess(false_positives, 150)  # ~1% expected
+
+    def test_like_view_is_idempotent(self):
+        self.client.force_login(self.member)
+        url = reverse('blog:like_post', args=[self.posts[0].pk])
+        for _ in range(3):
+            data = self.client.get(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest').json()
+        self.assertEqual(data, {'success': True, 'likes': 1, 'liked': True})
+
+
+@override_settings(CACHES=TEST_CACHES)
+class KeysetPaginatorTests(TestCase):
+    """Walking the cursors must visit every row once, in order, even where the sort key ties"""
+
+    PER_PAGE = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        author = Member.objects.create(username='writer', registration_number='WRI1')
+        moment = timezone.now()
+        for i in range(23):
+            post = BlogPost.objects.create(title=f'Post {i}', content='-', author=author)
+            # Three posts share each timestamp, so the id has to break the ties
+            BlogPost.objects.filter(pk=post.pk).update(created_at=moment - timedelta(hours=i // 3))
+
+    def setUp(self):
+        self.paginator = KeysetPaginator(BlogPost.objects.all(), self.PER_PAGE)
+        self.expected = list(BlogPost.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+
+    def test_next_links_walk_every_row_once(self):
+        page = self.paginator.page()
+        self.assertFalse(page.has_previous())
+        seen = [post.pk for post in page]
+        while page.has_next():
+            page = self.paginator.page(after=page.next_cursor)
+            self.assertTrue(page.has_previous())
+            seen += [post.pk for post in page]
+        self.assertEqual(seen, self.expected)
+
+    def test_previous_links_return_the_same_pages(self):
+        pages = [self.paginator.page()]
+        while pages[-1].has_next():
+            pages.append(self.paginator.page(after=pages[-1].next_cursor))
+
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            page = self.paginator.page(before=page.previous_cursor)
+            self.assertEqual([post.pk for post in page], [post.pk for post in expected])
+        self.assertFalse(page.has_previous())
+
+    def test_malformed_cursor_starts_from_the_top(self):
+        for cursor in ('not-a-cursor', 'WyJ4Il0', ''):
+            self.assertEqual([post.pk for post in self.paginator.page(after=cursor)], self.expected[:self.PER_PAGE])
+
+    def test_page_costs_one_query_however_deep(self):
+        page = self.paginator.page()
+        for _ in range(4):
+            page = self.paginator.page(after=page.next_cursor)
+        with CaptureQueriesContext(connection) as queries:
+            list(self.paginator.page(after=page.next_cursor))
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('OFFSET', queries[0]['sql'].upper())
+
+    def test_links_keep_other_query_parameters(self):
+        page = self.paginator.page(params=QueryDict('q=risk&page=3'))
+        self.assertEqual(page.next_querystring, f'q=risk&after={page.next_cursor}')
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SearchTests(TestCase):
+    """Only public content is searchable, every word must match and words match by prefix"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Member.objects.create(username='author', registration_number='AUT1')
+        cls.public = BlogPost.objects.create(
+            title='Pricing life annuities', content='Actuarial present values for whole life annuities.',
+            author=cls.author, is_published=True, is_approved=True,
+        )
+        cls.draft = BlogPost.objects.create(
+            title='Annuity draft', content='Not approved yet.', author=cls.author, is_published=True,
+        )
+
+    def urls(self, query):
+        return [result['url'] for result in search_documents(query)]
+
+    def test_only_public_objects_are_found(self):
+        self.assertEqual(self.urls('annuit'), [reverse('blog:post_detail', args=[self.public.pk])])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(len(self.urls('life actuarial')), 1)
+        self.assertEqual(self.urls('life pensions'), [])
+
+    def test_index_follows_changes(self):
+        BlogPost.objects.filter(pk=self.draft.pk).update(is_approved=True)
+        self.draft.refresh_from_db()
+        self.draft.save()
+        self.assertEqual(len(self.urls('annuit')), 2)
+
+        self.public.is_published = False
+        self.public.save()
+        self.draft.delete()
+        self.assertEqual(self.urls('annuit'), [])
+
+    def test_admin_action_on_a_filtered_changelist_indexes_the_objects(self):
+        admin_user = Member.objects.create_superuser(username='editor', password='pw', registration_number='EDI1')
+        self.client.force_login(admin_user)
+        # The queryset of "not approved" posts no longer matches the draft once it is approved
+        self.client.post(reverse('admin:blog_blogpost_changelist') + '?is_approved__exact=0', {
+            'action': 'approve_posts', '_selected_action': [self.draft.pk],
+        })
+        self.assertEqual(len(self.urls('annuit')), 2)
+
+    def test_results_mark_matches_and_escape_content(self):
+        BlogPost.objects.create(title='<b>Loss</b> models', content='Severity <script>x</script>',
+                                author=self.author, is_published=True, is_approved=True)
+        result = search_documents('loss')[0]
+        self.assertEqual(result['label'], 'Blog')
+        self.assertIn('<mark>Loss</mark>', result['title'])
+        self.assertNotIn('<script>', result['snippet'])
+
+    def test_operator_characters_are_treated_as_text(self):
+        for query in ('"', 'annuit* OR', 'NEAR(', '-life'):
+            with self.subTest(query=query):
+                search_documents(query)
+
+    def test_ajax_view_returns_json(self):
+        response = self.client.get(reverse('search'), {'q': 'annuities'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        results = response.json()['results']
+        self.assertEqual([result['label'] for result in results], ['Blog'])
+        self.assertEqual(set(results[0]), {'label', 'url', 'title', 'snippet'})
@@ -0,0 +1,182 @@
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, wait
+from django.conf import settings
+from django.contrib import messages
+from django.core.exceptions import PermissionDenied
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import connections
+from django.shortcuts import get_object_or_404, redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from .forms import BulkUploadForm
+from .images import process_upload
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tif', '.tiff'}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """Process pool shared by every bulk upload in this worker, started on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: forking a threaded ASGI worker can deadlock the children
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_UPLOAD_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _pool
+
+
+def _stage_uploads(form, staging_dir):
+    """
+    Copy the uploaded files (already streamed to temporary files by the upload
+    handler) and the image members of any archive into `staging_dir`, chunk by
+    chunk. Returns the staged paths; names are generated, never taken from the zip.
+    """
+    staged = []
+
+    def stage(fileobj, original_name):
+        if len(staged) >= settings.IMAGE_UPLOAD_MAX_FILES:
+            return
+        extension = os.path.splitext(original_name)[1].lower()
+        if extension not in IMAGE_EXTENSIONS:
+            return
+        staged_path = os.path.join(staging_dir, f'{len(staged):05d}{extension}')
+        with open(staged_path, 'wb') as destination:
+            shutil.copyfileobj(fileobj, destination, 1024 * 1024)
+        staged.append(staged_path)
+
+    for upload in form.cleaned_data['images']:
+        stage(upload, upload.name)
+
+    archive = form.cleaned_data.get('archive')
+    if archive:
+        with zipfile.ZipFile(archive) as zip_file:
+            for member in zip_file.infolist():
+                # Skip directories, macOS resource forks and anything that inflates past the limit
+                if member.is_dir() or '__MACOSX' in member.filename or member.file_size > settings.IMAGE_UPLOAD_MAX_FILE_SIZE:
+                    continue
+                with zip_file.open(member) as fileobj:
+                    stage(fileobj, member.filename)
+    return staged
+
+
+def _finish_bulk_upload(futures, build_row, model, staging_dir):
+    """Collector thread: wait for the pool, then save every processed image in one bulk_create"""
+    try:
+        wait(futures)
+        rows = []
+        for future, name in futures.items():
+            error = future.exception() or future.result()
+            if error:
+                logger.warning('Bulk upload: skipped %s: %s', name, error)
+            else:
+                rows.append(build_row(name))
+        model.objects.bulk_create(rows, batch_size=200)
+        logger.info('Bulk upload: saved %d of %d %s rows', len(rows), len(futures), model.__name__)
+    except Exception:
+        logger.exception('Bulk upload failed')
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        connections.close_all()
+
+
+def queue_bulk_upload(staged_paths, model, field_name, build_row, staging_dir):
+    """
+    Hand the staged files to the process pool and return straight away. The rows are
+    created by a background thread once every file is processed; a worker restart
+    before then drops the batch.
+    """
+    field = model._meta.get_field(field_name)
+    storage = field.storage
+    pool = _get_pool()
+
+    futures = {}
+    for source_path in staged_paths:
+        name = field.generate_filename(None, f'{uuid.uuid4().hex[:12]}.jpg')
+        future = pool.submit(
+            process_upload, source_path, storage.path(name),
+            settings.IMAGE_UPLOAD_MAX_DIMENSION, settings.IMAGE_VARIANT_QUALITY,
+        )
+        futures[future] = name
+
+    threading.Thread(
+        target=_finish_bulk_upload, args=(futures, build_row, model, staging_dir), daemon=True
+    ).start()
+    return len(futures)
+
+
+class BulkUploadAdminMixin:
+    """
+    Adds a "Bulk upload photos" page to a ModelAdmin whose objects own photos.
+    Set bulk_upload_model (e.g. Photo), bulk_upload_field (its ImageField) and
+    bulk_upload_parent (the ForeignKey back to this model).
+    """
+    bulk_upload_model = None
+    bulk_upload_field = 'image'
+    bulk_upload_parent = None
+    change_form_template = 'admin/bulk_upload_change_form.html'
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                '<path:object_id>/bulk-upload/',
+                self.admin_site.admin_view(self.bulk_upload_view),
+                name=f'{opts.app_label}_{opts.model_name}_bulk_upload',
+            ),
+        ] + super().get_urls()
+
+    @method_decorator(csrf_exempt)
+    def bulk_upload_view(self, request, object_id):
+        # Large batches go straight to temporary files instead of memory. This has to
+        # happen before anything reads request.POST, hence the CSRF check afterwards.
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return self._bulk_upload_view(request, object_id)
+
+    @method_decorator(csrf_protect)
+    def _bulk_upload_view(self, request, object_id):
+        parent = get_object_or_404(self.model, pk=object_id)
+        if not self.has_change_permission(request, parent):
+            raise PermissionDenied
+
+        form = BulkUploadForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            # Outside MEDIA_ROOT, so nothing unprocessed is ever publicly served
+            staging_dir = tempfile.mkdtemp(prefix='bulk-upload-', dir=settings.FILE_UPLOAD_TEMP_DIR)
+            staged = _stage_uploads(form, staging_dir)
+            if staged:
+                def build_row(name):
+                    return self.bulk_upload_model(**{self.bulk_upload_parent: parent, self.bulk_upload_field: name})
+
+                count = queue_bulk_upload(staged, self.bulk_upload_model, self.bulk_upload_field,
+                                          build_row, staging_dir)
+                self.message_user(request, f'{count} images are being processed and will appear shortly.')
+            else:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                self.message_user(request, 'No images were found in the upload.', level=messages.WARNING)
+            return redirect(f'admin:{self.model._meta.app_label}_{self.model._meta.model_name}_change', parent.pk)
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': f'Bulk upload photos to {parent}',
+            'opts': self.model._meta,
+            'original': parent,
+            'form': form,
+            'max_files': settings.IMAGE_UPLOAD_MAX_FILES,
+        }
+        return TemplateResponse(request, 'admin/bulk_upload.html', context)
@@ -7,7 +7,9 @@ urlpatterns = [
     path('contact/', views.contact, name='contact'),
     path('testimonial/', views.submit_testimonial, name='submit_testimonial'),
     path('constitution/', constitution_view, name='constitution'),
+    path('search/', views.search, name='search'),
     path('admin/messages/', views.admin_message_list, name='admin_message_list'),
     path('admin/messages/<int:message_id>/', views.admin_message_detail, name='admin_message_detail'),
     path('chatbot-api/', views.chatbot_api, name='chatbot_api'),
+    path('chatbot-api/stream/', views.chatbot_stream, name='chatbot_stream'),
 ]
\ No newline at end of file
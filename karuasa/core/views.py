@@ -1,5 +1,7 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
+from django.contrib.messages import get_messages
+from django.core.cache import cache
 from django.core.mail import send_mail
 from django.conf import settings
 from .models import SliderImage, Partner, Testimonial, SiteInfo, Leader, ContactMessage
@@ -7,54 +9,73 @@ from events.models import Event
 from projects.models import Project
 from .forms import ContactForm, TestimonialForm
 from django.utils import timezone
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse
+from django.db import DatabaseError
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from django.conf import settings
-import requests
+from .signals import HOME_PAGE_CACHE_KEY
+from .context_processors import get_site_info
+from .search import search_documents
 from .models import Constitution
 from django.contrib.auth.decorators import login_required, user_passes_test
 
 def home(request):
-    # Use try-except to handle cases where models aren't migrated yet
-    try:
-        sliders = SliderImage.objects.filter(is_active=True).order_by('created_at')
-        partners = Partner.objects.filter(is_active=True)
-        testimonials = Testimonial.objects.filter(is_approved=True)
-        
-        # Get upcoming events (events with future dates)
-        upcoming_events = Event.objects.filter(
-            is_active=True, 
-            event_type='upcoming',
-            date__gte=timezone.now()
-        ).order_by('date')[:3]  # Limit to 3 events
-        
-        # Get featured projects
-        featured_projects = Project.objects.filter(
-            is_approved=True,
-            is_featured=True
-        ).order_by('-created_at')[:2]  # Limit to 2 featured projects
-        
-    except Exception as e:
-        print(f"Error loading data: {e}")
-        sliders = []
-        partners = []
-        testimonials = []
-        upcoming_events = []
-        featured_projects = []
-    
+    # Anonymous visitors all see the same page, so serve it straight from the cache
+    cacheable = not request.user.is_authenticated and not get_messages(request)
+    if cacheable:
+        content = cache.get(HOME_PAGE_CACHE_KEY)
+        if content is not None:
+            return HttpResponse(content)
+
+    # Querysets stay lazy so sections served from fragment cache never hit the database
+    sliders = SliderImage.objects.filter(is_active=True).order_by('created_at')
+    partners = Partner.objects.filter(is_active=True)
+    testimonials = Testimonial.objects.filter(is_approved=True)
+
+    # Get upcoming events (events with future dates)
+    upcoming_events = Event.objects.filter(
+        is_active=True, 
+        event_type='upcoming',
+        date__gte=timezone.now()
+    ).order_by('date')[:3]  # Limit to 3 events
+
+    # Get featured projects
+    featured_projects = Project.objects.filter(
+        is_approved=True,
+        is_featured=True
+    ).prefetch_related('members').order_by('-created_at')[:2]  # Limit to 2 featured projects
+
     context = {
         'sliders': sliders,
         'partners': partners,
         'testimonials': testimonials,
         'upcoming_events': upcoming_events,
         'featured_projects': featured_projects,
+        'home_cache_timeout': settings.HOME_CACHE_TIMEOUT,
     }
-    return render(request, 'home.html', context)
+
+    # Use try-except to handle cases where models aren't migrated yet
+    try:
+        response = render(request, 'home.html', context)
+    except DatabaseError as e:
+        print(f"Error loading data: {e}")
+        context.update({
+            'sliders': [],
+            'partners': [],
+            'testimonials': [],
+            'upcoming_events': [],
+            'featured_projects': [],
+        })
+        return render(request, 'home.html', context)
+
+    if cacheable:
+        cache.set(HOME_PAGE_CACHE_KEY, response.content, settings.HOME_CACHE_TIMEOUT)
+    return response
 
 def about_us(request):
     try:
-        about_content = SiteInfo.objects.first()  # Rename to match template
+        about_content = get_site_info()  # Rename to match template
         leaders = Leader.objects.filter(is_active=True)
         constitution = Constitution.objects.filter(is_active=True).first()
     except Exception as e:
@@ -96,6 +117,19 @@ def submit_testimonial(request):
     
     return render(request, 'core/submit_testimonial.html', {'form': form})
 
+def search(request):
+    """Site-wide search over blog posts, projects, resources and events"""
+    query = request.GET.get('q', '').strip()[:200]
+    results = search_documents(query) if query else []
+
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse({'results': [
+            {'label': r['label'], 'url': r['url'], 'title': r['title'], 'snippet': r['snippet']}
+            for r in results
+        ]})
+
+    return render(request, 'core/search.html', {'query': query, 'results': results})
+
 # In your views.py
 from .models import Constitution
 
@@ -149,16 +183,18 @@ def admin_message_detail(request, message_id):
 
 
 
-import requests
 import json
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
-from django.conf import settings
-from django.views.decorators.http import require_POST
+import httpx
+from django.http import HttpResponseNotAllowed, StreamingHttpResponse
+from asgiref.sync import sync_to_async
+from .services import generate_chatbot_reply, stream_chatbot_reply, lookup_cached_reply, store_cached_reply
+
+# Async view: served from the ASGI event loop so a slow Gemini reply doesn't hold a worker.
+# csrf_exempt/require_POST aren't async-aware in Django 4.2, so they're applied by hand below.
+async def chatbot_api(request):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
 
-@csrf_exempt
-@require_POST
-def chatbot_api(request):
     try:
         # Get the message from POST data
         user_message = request.POST.get('message', '').strip()
@@ -166,98 +202,33 @@ def chatbot_api(request):
         if not user_message:
             return JsonResponse({'error': 'No message provided'}, status=400)
 
-        # Enhanced prompt for actuarial focus
-        prompt = f"""You are KARUASA Assistant, a helpful AI for the Karatina University Actuarial Students Association. 
-        
-About KARUASA: We are the Karatina University Actuarial Students Association, dedicated to empowering future actuaries through excellence and innovation.
-
-Your expertise covers:
-- Actuarial science concepts, principles, and methodologies
-- Professional actuarial exams (SOA, CAS, IFoA)
-- Programming for actuaries (Python, R, SQL, Excel)
-- Mathematics, statistics, and probability
-- Economics, finance, and risk management
-- Career guidance in the actuarial field
-- Study tips, resources, and exam preparation strategies
-- Professional development and networking
-- Motivational support for actuarial students
-
-Important guidelines:
-- Be encouraging, professional, and supportive
-- Provide accurate, practical information
-- Focus on educational value
-- Keep responses clear and concise
-- If you don't know something, admit it and suggest resources
-- Always maintain a positive and helpful tone
-
-User question: {user_message}
-
-Please provide a helpful response that would benefit actuarial students."""
-
         # Check if API key is configured
-        if not hasattr(settings, 'GEMINI_API_KEY') or not settings.GEMINI_API_KEY:
+        if not settings.GEMINI_API_KEY:
             return JsonResponse({
                 'response': 'I apologize, but the AI assistant is currently being configured. Please check back later or contact the administrator.'
             })
 
-        # CORRECT model name (remove "models/" prefix)
-        model_name = "gemini-2.0-flash"  # Just the model name, not "models/gemini-2.0-flash"
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/{model_name}:generateContent?key={settings.GEMINI_API_KEY}"
-        
-        print(f"Attempting to call Gemini API with model: {model_name}")
-        print(f"API URL: {url.split('?')[0]}")  # Print without API key for security
-        
-        # Make request to Gemini API
-        response = requests.post(
-            url,
-            json={
-                "contents": [{
-                    "parts": [{
-                        "text": prompt
-                    }]
-                }],
-                "generationConfig": {
-                    "temperature": 0.7,
-                    "topK": 40,
-                    "topP": 0.95,
-                    "maxOutputTokens": 1024,
-                }
-            },
-            headers={
-                'Content-Type': 'application/json',
-            },
-            timeout=30  # 30 second timeout
-        )
-        
-        response.raise_for_status()  # This will raise an exception for bad status codes
-        
-        data = response.json()
-        
-        # Check if we have a valid response structure
-        if (data.get('candidates') and 
-            len(data['candidates']) > 0 and 
-            data['candidates'][0].get('content') and 
-            data['candidates'][0]['content'].get('parts') and 
-            len(data['candidates'][0]['content']['parts']) > 0):
-            
-            bot_response = data['candidates'][0]['content']['parts'][0]['text']
-            print(f"Successfully received response from Gemini API")
-            return JsonResponse({'response': bot_response})
-            
-        else:
-            print(f"Unexpected response structure: {data}")
+        cached_response = await sync_to_async(lookup_cached_reply)(user_message)
+        if cached_response is not None:
+            return JsonResponse({'response': cached_response, 'cached': True})
+
+        bot_response = await generate_chatbot_reply(user_message)
+        if bot_response is None:
             return JsonResponse({
                 'response': 'I received an unexpected response format. Please try again.'
             })
+
+        await sync_to_async(store_cached_reply)(user_message, bot_response)
+        return JsonResponse({'response': bot_response})
             
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         print("Gemini API request timed out")
         return JsonResponse({
             'response': 'The request timed out. Please try again in a moment.'
         })
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Gemini API request error: {e}")
-        if hasattr(e, 'response') and e.response:
+        if isinstance(e, httpx.HTTPStatusError):
             print(f"Response status: {e.response.status_code}")
             print(f"Response content: {e.response.text}")
             
@@ -270,4 +241,66 @@ Please provide a helpful response that would benefit actuarial students."""
         print(f"Traceback: {traceback.format_exc()}")
         return JsonResponse({
             'response': 'An unexpected error occurred. Please try again later.'
-        })
\ No newline at end of file
+        })
+
+chatbot_api.csrf_exempt = True
+
+
+def _sse(data, event=None):
+    """Format one Server-Sent Events frame"""
+    frame = f"event: {event}\n" if event else ""
+    return f"{frame}data: {json.dumps(data)}\n\n"
+
+
+async def chatbot_stream(request):
+    """
+    Streaming variant of chatbot_api: relays Gemini's reply as Server-Sent Events so the
+    widget can show the first tokens immediately. Frames carry {"text": chunk}; the stream
+    ends with an "error" or "done" event. chatbot_api remains the JSON fallback.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
+    user_message = request.POST.get('message', '').strip()
+    if not user_message:
+        return JsonResponse({'error': 'No message provided'}, status=400)
+
+    async def events():
+        if not settings.GEMINI_API_KEY:
+            yield _sse({'text': 'I apologize, but the AI assistant is currently being configured. Please check back later or contact the administrator.'})
+            yield _sse({}, event='done')
+            return
+
+        cached_response = await sync_to_async(lookup_cached_reply)(user_message)
+        if cached_response is not None:
+            yield _sse({'text': cached_response})
+            yield _sse({'cached': True}, event='done')
+            return
+
+        chunks = []
+        try:
+            async for text in stream_chatbot_reply(user_message):
+                chunks.append(text)
+                yield _sse({'text': text})
+        except httpx.TimeoutException:
+            print("Gemini API stream timed out")
+            yield _sse({'message': 'The request timed out. Please try again in a moment.'}, event='error')
+            return
+        except httpx.HTTPError as e:
+            print(f"Gemini API stream error: {e}")
+            yield _sse({'message': 'I apologize, but I\'m having trouble connecting to the AI service right now. Please try again later.'}, event='error')
+            return
+
+        if not chunks:
+            yield _sse({'message': 'I received an unexpected response format. Please try again.'}, event='error')
+            return
+
+        await sync_to_async(store_cached_reply)(user_message, ''.join(chunks))
+        yield _sse({}, event='done')
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop proxies from buffering the stream
+    return response
+
+chatbot_stream.csrf_exempt = True
@@ -1,17 +1,47 @@
-from django.contrib import admin
-from .models import UserProgress, Course, Competition, CompetitionSubmission
+from django.contrib import admin, messages
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import UserProgress, Course, Competition, CompetitionSubmission, GradingJob, PointsAward, AIResponseCache
+from .leaderboard import move_competition_score
+from .services import enqueue_regrading, recalculate_total_points, record_score
 
 @admin.register(UserProgress)
 class UserProgressAdmin(admin.ModelAdmin):
     list_display = ['member', 'completed_courses_count', 'total_points', 'current_level']
     list_filter = ['current_level']
-    search_fields = ['member__username', 'member__email']
+    # Prefix searches only, on the indexed username and email columns: a contains
+    # search cannot use an index and scans every row
+    search_fields = ['^member__username', '^member__email']
     filter_horizontal = ['completed_courses']
-    readonly_fields = ['total_points']
+    readonly_fields = ['total_points', 'current_level']
+    list_select_related = ['member']
+    raw_id_fields = ['member']
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # A correlated subquery is only evaluated for the rows on the page; a joined
+        # Count() would GROUP BY the whole table first
+        completed = (
+            UserProgress.completed_courses.through.objects
+            .filter(userprogress_id=OuterRef('pk'))
+            .values('userprogress_id')
+            .annotate(total=Count('*'))
+            .values('total')
+        )
+        return super().get_queryset(request).annotate(
+            completed_courses_total=Coalesce(Subquery(completed), 0)
+        )
     
     def completed_courses_count(self, obj):
-        return obj.completed_courses.count()
+        return obj.completed_courses_total
     completed_courses_count.short_description = 'Courses Completed'
+    completed_courses_count.admin_order_field = 'completed_courses_total'
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Courses ticked or unticked here change the member's ledger and points
+        recalculate_total_points([form.instance.member_id])
 
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
@@ -32,29 +62,95 @@ class CourseAdmin(admin.ModelAdmin):
 
 @admin.register(Competition)
 class CompetitionAdmin(admin.ModelAdmin):
-    list_display = ['title', 'start_date', 'end_date', 'is_active', 'submission_count']
-    list_filter = ['is_active', 'start_date', 'end_date']
+    list_display = ['title', 'start_date', 'end_date', 'is_active', 'is_scheduled', 'submission_count']
+    list_filter = ['is_active', 'is_scheduled', 'start_date', 'end_date']
     list_editable = ['is_active']
     search_fields = ['title', 'description']
     readonly_fields = ['created_at']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(submission_total=Count('competitionsubmission'))
     
     def submission_count(self, obj):
-        return obj.competitionsubmission_set.count()
+        return obj.submission_total
     submission_count.short_description = 'Submissions'
+    submission_count.admin_order_field = 'submission_total'
 
 @admin.register(CompetitionSubmission)
 class CompetitionSubmissionAdmin(admin.ModelAdmin):
     list_display = ['competition', 'participant', 'score', 'submitted_at']
     list_filter = ['competition', 'submitted_at']
-    search_fields = ['competition__title', 'participant__username', 'solution']
+    search_fields = ['^participant__username', '^participant__email']
     readonly_fields = ['submitted_at']
+    list_select_related = ['competition', 'participant']
+    raw_id_fields = ['competition', 'participant']
+    show_full_result_count = False
     
-    actions = ['recalculate_scores']
-
-    def recalculate_scores(self, request, queryset):
-        # This would trigger the AI scoring again
-        for submission in queryset:
-            # You could implement a recalculation method here
-            pass
-        self.message_user(request, f'{queryset.count()} submissions marked for recalculation.')
-    recalculate_scores.short_description = "Recalculate scores for selected submissions"
\ No newline at end of file
+    actions = ['queue_regrading']
+
+    def save_model(self, request, obj, form, change):
+        # Scores entered here go through record_score like graded ones, so the points
+        # ledger and the leaderboard's rank counts follow them
+        score = obj.score
+        if 'score' in form.changed_data and score is not None:
+            obj.score = form.initial.get('score')
+            super().save_model(request, obj, form, change)
+            record_score(obj, score)
+            obj.score = score
+            return
+        super().save_model(request, obj, form, change)
+        if 'score' in form.changed_data:
+            # A cleared score leaves the ranking; recompute_progress takes back its points
+            move_competition_score(obj.competition_id, form.initial.get('score'), None)
+
+    def queue_regrading(self, request, queryset):
+        # The grading worker re-grades them; grading here would outlast the request timeout
+        queued = enqueue_regrading(queryset)
+        self.message_user(request, f'{queued} submissions queued for re-grading. Scores and points change once the grading worker has graded them.')
+        skipped = queryset.count() - queued
+        if skipped:
+            self.message_user(request, f'{skipped} submissions are being graded right now and were not queued again.', level=messages.WARNING)
+    queue_regrading.short_description = "Queue selected submissions for re-grading"
+
+@admin.register(PointsAward)
+class PointsAwardAdmin(admin.ModelAdmin):
+    list_display = ['member', 'reason', 'object_id', 'points', 'awarded_at']
+    list_filter = ['reason']
+    search_fields = ['^member__username', '^member__email']
+    readonly_fields = ['member', 'reason', 'object_id', 'points', 'awarded_at', 'updated_at']
+    list_select_related = ['member']
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        # Awards are derived from courses and competition scores; run recompute_progress instead
+        return False
+
+@admin.register(GradingJob)
+class GradingJobAdmin(admin.ModelAdmin):
+    list_display = ['submission', 'status', 'attempts', 'run_after', 'updated_at']
+    list_filter = ['status', 'submission__competition']
+    search_fields = ['^submission__participant__username', '^submission__participant__email']
+    readonly_fields = ['submission', 'attempts', 'last_error', 'created_at', 'updated_at']
+    list_select_related = ['submission__competition', 'submission__participant']
+    show_full_result_count = False
+
+    actions = ['retry_jobs']
+
+    def retry_jobs(self, request, queryset):
+        count = queryset.exclude(status='running').update(status='pending', attempts=0, run_after=timezone.now())
+        self.message_user(request, f'{count} grading jobs queued for retry.')
+    retry_jobs.short_description = "Retry selected grading jobs"
+
+@admin.register(AIResponseCache)
+class AIResponseCacheAdmin(admin.ModelAdmin):
+    list_display = ['prompt_hash', 'model_name', 'response_preview', 'created_at']
+    list_filter = ['model_name', 'created_at']
+    search_fields = ['prompt_hash', 'response']
+    readonly_fields = ['prompt_hash', 'model_name', 'response', 'created_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def response_preview(self, obj):
+        return obj.response[:100] + '...' if len(obj.response) > 100 else obj.response
+    response_preview.short_description = 'Response'
@@ -0,0 +1,143 @@
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from .models import CompetitionScoreCount, CompetitionSubmission, PointsTotalCount, UserProgress
+
+# Both leaderboards read straight off their indexes (see the model Meta): the database
+# keeps the order up to date as scores change, so top-N is a range read with no sort.
+#
+# Ranks come from CompetitionScoreCount and PointsTotalCount, which count the entries
+# at each score or total. Whatever changes a score or a total moves one entry between
+# two counts (move_competition_score, move_points_total); recompute_progress rebuilds
+# them from scratch. A rank is then 1 + the sum of the counts above the value, in one
+# aggregate over one row per distinct value: at most 101 rows for a competition scored
+# 0-100, and as many rows as there are distinct point totals for the global rank,
+# however many members share them.
+
+
+def _with_shared_ranks(rows, value):
+    """
+    Set `rank` on rows ordered best first. Equal values share the rank of the first
+    of them, as in competition_rank and global_rank: every row ahead is in the list.
+    """
+    previous = None
+    for position, row in enumerate(rows, start=1):
+        if previous is None or value(row) != value(previous):
+            row.rank = position
+        else:
+            row.rank = previous.rank
+        previous = row
+    return rows
+
+
+def _move(model, scope, field, old, new):
+    """Move one entry of `model`'s counts from value `old` to `new`; None is not counted"""
+    if old == new:
+        return
+    with transaction.atomic():
+        if old is not None:
+            counts = model.objects.filter(**scope, **{field: old})
+            counts.update(entries=F('entries') - 1)
+            counts.filter(entries__lte=0).delete()
+        if new is not None:
+            counts = model.objects.filter(**scope, **{field: new})
+            if not counts.update(entries=F('entries') + 1):
+                # The unique constraint settles two workers creating the same count
+                model.objects.get_or_create(**scope, **{field: new})
+                counts.update(entries=F('entries') + 1)
+
+
+def move_competition_score(competition_id, old, new):
+    """Count a submission's score change from `old` to `new` (None while ungraded)"""
+    _move(CompetitionScoreCount, {'competition_id': competition_id}, 'score', old, new)
+
+
+def move_points_total(old, new):
+    """Count a member's total_points change; members without points aren't ranked"""
+    _move(PointsTotalCount, {}, 'total_points',
+          old if old is not None and old > 0 else None,
+          new if new is not None and new > 0 else None)
+
+
+def uncount_deleted(sender, instance, **kwargs):
+    """post_delete handler for CompetitionSubmission and UserProgress"""
+    if isinstance(instance, CompetitionSubmission):
+        move_competition_score(instance.competition_id, instance.score, None)
+    else:
+        move_points_total(instance.total_points, None)
+
+
+def rebuild_rank_counts():
+    """Recount every competition score and points total from the source tables"""
+    with transaction.atomic():
+        CompetitionScoreCount.objects.all().delete()
+        CompetitionScoreCount.objects.bulk_create([
+            CompetitionScoreCount(competition_id=row['competition_id'], score=row['score'], entries=row['entries'])
+            for row in CompetitionSubmission.objects.filter(score__isnull=False)
+            .values('competition_id', 'score').annotate(entries=Count('id')).order_by()
+        ], batch_size=500)
+
+        PointsTotalCount.objects.all().delete()
+        PointsTotalCount.objects.bulk_create([
+            PointsTotalCount(total_points=row['total_points'], entries=row['entries'])
+            for row in UserProgress.objects.filter(total_points__gt=0)
+            .values('total_points').annotate(entries=Count('id')).order_by()
+        ], batch_size=500)
+
+
+def _rank(counts, field, value):
+    """(rank, ranked entries) from the count rows in `counts`"""
+    totals = counts.aggregate(
+        ahead=Coalesce(Sum('entries', filter=Q(**{f'{field}__gt': value})), 0),
+        total=Coalesce(Sum('entries'), 0),
+    )
+    rank = totals['ahead'] + 1
+    # `value` may come from a cached snapshot that the counts have already moved past
+    return rank, max(totals['total'], rank)
+
+
+def competition_leaderboard(competition_id, limit=10):
+    """The `limit` best graded submissions with their `rank`, earliest first among equal scores"""
+    return _with_shared_ranks(list(
+        CompetitionSubmission.objects.filter(competition_id=competition_id, score__isnull=False)
+        .select_related('participant').defer('solution')
+        .order_by('-score', 'submitted_at')[:limit]
+    ), lambda submission: submission.score)
+
+
+def competition_rank(submission):
+    """
+    (rank, graded submissions) for a graded submission, or None if it isn't scored yet.
+    Equal scores share a rank.
+    """
+    if submission is None or submission.score is None:
+        return None
+    counts = CompetitionScoreCount.objects.filter(competition_id=submission.competition_id)
+    return _rank(counts, 'score', submission.score)
+
+
+def with_competition_rank(submissions):
+    """Annotate each submission with `rank` in its competition (None while ungraded)"""
+    ahead = CompetitionScoreCount.objects.filter(
+        competition_id=OuterRef('competition_id'), score__gt=OuterRef('score')
+    ).values('competition_id').annotate(total=Sum('entries')).values('total')
+    return submissions.annotate(rank=Case(
+        When(score__isnull=True, then=Value(None)),
+        default=Coalesce(Subquery(ahead), Value(0)) + 1,
+        output_field=IntegerField(),
+    ))
+
+
+def global_leaderboard(limit=10):
+    """Members with the most points across courses and all competitions, with their `rank`"""
+    return _with_shared_ranks(list(
+        UserProgress.objects.filter(total_points__gt=0).select_related('member')
+        .order_by('-total_points', 'member_id')[:limit]
+    ), lambda progress: progress.total_points)
+
+
+def global_rank(total_points):
+    """(rank, ranked members) for a member with `total_points`, or None with no points yet"""
+    if total_points <= 0:
+        return None
+    return _rank(PointsTotalCount.objects.all(), 'total_points', total_points)
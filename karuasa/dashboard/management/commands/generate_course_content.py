@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from django.core.management.base import BaseCommand
 from dashboard.models import Course
 import google.generativeai as genai
@@ -5,34 +6,86 @@ import os
 
 class Command(BaseCommand):
     help = 'Generate course content using Gemini API'
-    
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=6,
+                            help='Number of Gemini requests in flight at once')
+        scope = parser.add_mutually_exclusive_group()
+        scope.add_argument('--all', action='store_true',
+                           help='Regenerate every course, replacing existing content (one Gemini call per course)')
+        scope.add_argument('--resume', action='store_true',
+                           help='Only fill in courses with empty content; this is the default, kept for existing scripts')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='List the courses that would be generated without calling Gemini')
+        parser.add_argument('--batch-size', type=int, default=5,
+                            help='Number of generated courses saved per bulk update')
+
     def handle(self, *args, **options):
+        courses = Course.objects.order_by('course_code')
+        if not options['all']:
+            courses = courses.filter(content='')
+        courses = list(courses)
+
+        if options['dry_run']:
+            for course in courses:
+                self.stdout.write(f'Would generate content for {course.name} ({course.course_code})')
+            self.stdout.write(self.style.SUCCESS(f'{len(courses)} courses would be generated'))
+            return
+
         gemini_api_key = os.getenv('GEMINI_API_KEY', '')
         if not gemini_api_key:
             self.stdout.write(self.style.ERROR('Gemini API key not configured'))
             return
-            
+
         genai.configure(api_key=gemini_api_key)
-        model = genai.GenerativeModel('gemini-pro')
-        
-        for course in Course.objects.filter(content=''):
-            prompt = f"""
-            Generate comprehensive educational content for the actuarial science course: {course.name}
-            
-            Include:
-            1. Course overview and objectives
-            2. Key concepts and theories
-            3. Practical applications
-            4. Study tips and resources
-            5. Sample problems and solutions
-            
-            Format the content in HTML with proper headings and sections.
-            """
-            
+        self.model = genai.GenerativeModel('gemini-pro')
+
+        generated = []
+        saved = failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, options['concurrency'])) as pool:
+            futures = {pool.submit(self.generate, course): course for course in courses}
             try:
-                response = model.generate_content(prompt)
-                course.content = response.text
-                course.save()
-                self.stdout.write(self.style.SUCCESS(f'Generated content for {course.name}'))
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f'Error generating content for {course.name}: {str(e)}'))
\ No newline at end of file
+                for future in as_completed(futures):
+                    course = futures[future]
+                    try:
+                        course.content = future.result()
+                    except Exception as e:
+                        failed += 1
+                        self.stdout.write(self.style.ERROR(f'Error generating content for {course.name}: {str(e)}'))
+                        continue
+
+                    generated.append(course)
+                    self.stdout.write(self.style.SUCCESS(f'Generated content for {course.name}'))
+                    if len(generated) >= options['batch_size']:
+                        saved += self.save(generated)
+            except KeyboardInterrupt:
+                for future in futures:
+                    future.cancel()
+                self.stdout.write(self.style.WARNING('Interrupted; saving finished courses. The rest keep their previous content.'))
+            finally:
+                saved += self.save(generated)
+
+        self.stdout.write(self.style.SUCCESS(f'Saved {saved} courses ({failed} failed)'))
+
+    def generate(self, course):
+        prompt = f"""
+        Generate comprehensive educational content for the actuarial science course: {course.name}
+
+        Include:
+        1. Course overview and objectives
+        2. Key concepts and theories
+        3. Practical applications
+        4. Study tips and resources
+        5. Sample problems and solutions
+
+        Format the content in HTML with proper headings and sections.
+        """
+        return self.model.generate_content(prompt).text
+
+    def save(self, courses):
+        """Persist a batch of generated courses in one query and empty the list"""
+        count = len(courses)
+        if courses:
+            Course.objects.bulk_update(courses, ['content'])
+            courses.clear()
+        return count
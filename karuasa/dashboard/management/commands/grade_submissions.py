@@ -0,0 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import timedelta
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from dashboard.services import claim_grading_jobs, release_stale_grading_jobs, run_grading_job
+
+class Command(BaseCommand):
+    help = 'Grade queued competition submissions with Gemini (long-running worker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.GRADING_WORKERS,
+                            help='Number of submissions graded in parallel')
+        parser.add_argument('--max-attempts', type=int, default=settings.GRADING_MAX_ATTEMPTS,
+                            help='Attempts per submission before the job is marked failed')
+        parser.add_argument('--backoff', type=float, default=settings.GRADING_BACKOFF_SECONDS,
+                            help='Seconds before the first retry; doubles on each attempt')
+        parser.add_argument('--poll-interval', type=float, default=5,
+                            help='Seconds to wait between queue checks when idle')
+        parser.add_argument('--once', action='store_true',
+                            help='Grade everything that is currently due, then exit')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+
+        released = release_stale_grading_jobs(timedelta(minutes=15))
+        if released:
+            self.stdout.write(self.style.WARNING(f'Re-queued {released} jobs left running by a previous worker'))
+
+        self.stdout.write(f'Grading worker started with {workers} threads')
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                free_slots = workers - len(in_flight)
+                if free_slots:
+                    for job in claim_grading_jobs(free_slots):
+                        future = pool.submit(self.grade, job, options['max_attempts'], options['backoff'])
+                        in_flight[future] = job
+
+                if not in_flight:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                done, _ = wait(in_flight, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = in_flight.pop(future)
+                    self.report(job, future)
+
+    def grade(self, job, max_attempts, backoff):
+        try:
+            return run_grading_job(job, max_attempts, backoff)
+        finally:
+            # Each pool thread has its own connection; don't leave them open between jobs
+            connections.close_all()
+
+    def report(self, job, future):
+        try:
+            status = future.result()
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Error grading submission {job.submission_id}: {str(e)}'))
+            return
+
+        if status == 'done':
+            self.stdout.write(self.style.SUCCESS(f'Graded submission {job.submission_id}'))
+        elif status == 'pending':
+            self.stdout.write(self.style.WARNING(f'Submission {job.submission_id} will be retried (attempt {job.attempts})'))
+        else:
+            self.stdout.write(self.style.ERROR(f'Gave up grading submission {job.submission_id}'))
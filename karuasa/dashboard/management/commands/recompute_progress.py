@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from dashboard.models import UserProgress
+from dashboard.services import recalculate_total_points
+
+
+class Command(BaseCommand):
+    help = ('Sync the points ledger with completed courses and competition scores, then rebuild '
+            'total_points and current_level for every member with set-based SQL and recount the leaderboard ranks')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--member', type=int, action='append', dest='members',
+                            help='Only recompute this member id (can be repeated)')
+
+    def handle(self, *args, **options):
+        updated = recalculate_total_points(options['members'])
+        self.stdout.write(self.style.SUCCESS(f'Recomputed points and levels for {updated} members'))
+
+        if options['verbosity'] > 1:
+            levels = UserProgress.objects.values('current_level').annotate(members=Count('id')).order_by('current_level')
+            for row in levels:
+                self.stdout.write(f'  level {row["current_level"]}: {row["members"]} members')
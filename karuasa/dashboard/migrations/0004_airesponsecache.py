@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_gradingjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIResponseCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prompt_hash', models.CharField(max_length=64, unique=True)),
+                ('model_name', models.CharField(max_length=100)),
+                ('response', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'AI Response Cache',
+                'verbose_name_plural': 'AI Response Cache',
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0004_airesponsecache'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='competitionsubmission',
+            index=models.Index(fields=['competition', '-score', 'submitted_at'], name='submission_leaderboard_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprogress',
+            index=models.Index(fields=['-total_points', 'member'], name='progress_leaderboard_idx'),
+        ),
+    ]
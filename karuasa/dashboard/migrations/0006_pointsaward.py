@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('dashboard', '0005_leaderboard_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointsAward',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reason', models.CharField(choices=[('course', 'Course completed'), ('competition', 'Competition score')], max_length=20)),
+                ('object_id', models.PositiveIntegerField()),
+                ('points', models.IntegerField()),
+                ('awarded_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='points_awards', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-awarded_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='pointsaward',
+            constraint=models.UniqueConstraint(fields=('member', 'reason', 'object_id'), name='unique_points_award'),
+        ),
+    ]
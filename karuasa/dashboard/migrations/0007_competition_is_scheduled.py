@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0006_pointsaward'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='competition',
+            name='is_scheduled',
+            field=models.BooleanField(default=False),
+        ),
+    ]
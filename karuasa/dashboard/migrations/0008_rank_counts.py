@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def count_existing_ranks(apps, schema_editor):
+    """Fill the counts from the scores and totals already stored"""
+    CompetitionSubmission = apps.get_model('dashboard', 'CompetitionSubmission')
+    UserProgress = apps.get_model('dashboard', 'UserProgress')
+    CompetitionScoreCount = apps.get_model('dashboard', 'CompetitionScoreCount')
+    PointsTotalCount = apps.get_model('dashboard', 'PointsTotalCount')
+
+    CompetitionScoreCount.objects.bulk_create([
+        CompetitionScoreCount(competition_id=row['competition_id'], score=row['score'], entries=row['entries'])
+        for row in CompetitionSubmission.objects.filter(score__isnull=False)
+        .values('competition_id', 'score').annotate(entries=models.Count('id')).order_by()
+    ], batch_size=500)
+    PointsTotalCount.objects.bulk_create([
+        PointsTotalCount(total_points=row['total_points'], entries=row['entries'])
+        for row in UserProgress.objects.filter(total_points__gt=0)
+        .values('total_points').annotate(entries=models.Count('id')).order_by()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0007_competition_is_scheduled'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointsTotalCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_points', models.IntegerField(unique=True)),
+                ('entries', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CompetitionScoreCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('entries', models.PositiveIntegerField(default=0)),
+                ('competition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_counts', to='dashboard.competition')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='competitionscorecount',
+            constraint=models.UniqueConstraint(fields=('competition', 'score'), name='unique_competition_score_count'),
+        ),
+        migrations.RunPython(count_existing_ranks, migrations.RunPython.noop),
+    ]
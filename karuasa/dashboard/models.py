@@ -46,6 +46,8 @@ class Competition(models.Model):
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
     is_active = models.BooleanField(default=True)
+    # Generated ahead of time; the scheduler activates it at start_date
+    is_scheduled = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -70,6 +72,10 @@ class UserProgress(models.Model):
     total_points = models.IntegerField(default=0)
     current_level = models.IntegerField(default=1)
 
+    class Meta:
+        # Global leaderboard order (dashboard/leaderboard.py)
+        indexes = [models.Index(fields=['-total_points', 'member'], name='progress_leaderboard_idx')]
+
     def __str__(self):
         return f"Progress for {self.member.username}"
 
@@ -84,6 +90,103 @@ class CompetitionSubmission(models.Model):
 
     class Meta:
         unique_together = ['competition', 'participant']
+        # Competition leaderboard order (dashboard/leaderboard.py)
+        indexes = [
+            models.Index(fields=['competition', '-score', 'submitted_at'], name='submission_leaderboard_idx'),
+        ]
+
+    def __str__(self):
+        return f"Submission by {self.participant} for {self.competition}"
+
+class PointsAward(models.Model):
+    """
+    One entry in a member's points ledger. UserProgress.total_points is the sum of a
+    member's awards; `object_id` is the completed Course or the scored CompetitionSubmission.
+    """
+    REASON_CHOICES = [
+        ('course', 'Course completed'),
+        ('competition', 'Competition score'),
+    ]
+
+    member = models.ForeignKey(Member, on_delete=models.CASCADE, related_name='points_awards')
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    object_id = models.PositiveIntegerField()
+    points = models.IntegerField()
+    awarded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-awarded_at']
+        constraints = [
+            models.UniqueConstraint(fields=['member', 'reason', 'object_id'], name='unique_points_award'),
+        ]
+
+    def __str__(self):
+        return f"{self.points} points to {self.member} ({self.get_reason_display()})"
+
+
+class CompetitionScoreCount(models.Model):
+    """
+    How many graded submissions of a competition have each score, kept up to date by
+    dashboard/leaderboard.py. A rank is the sum of the counts above a score, read from
+    at most one row per distinct score instead of every submission ahead.
+    """
+    competition = models.ForeignKey(Competition, on_delete=models.CASCADE, related_name='score_counts')
+    score = models.FloatField()
+    entries = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['competition', 'score'], name='unique_competition_score_count'),
+        ]
+
+    def __str__(self):
+        return f"{self.entries} submissions scored {self.score} in {self.competition}"
+
+
+class PointsTotalCount(models.Model):
+    """How many members have each positive total_points, for global ranks (see CompetitionScoreCount)"""
+    total_points = models.IntegerField(unique=True)
+    entries = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.entries} members with {self.total_points} points"
+
+class GradingJob(models.Model):
+    """Queued AI grading of a competition submission, processed by `manage.py grade_submissions`"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    submission = models.OneToOneField(CompetitionSubmission, on_delete=models.CASCADE, related_name='grading_job')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['run_after']
+        indexes = [models.Index(fields=['status', 'run_after'])]
+
+    def __str__(self):
+        return f"Grading {self.submission} ({self.status})"
+
+
+class AIResponseCache(models.Model):
+    """Raw Gemini output, addressed by a hash of the model name, prompt and generation settings"""
+    prompt_hash = models.CharField(max_length=64, unique=True)
+    model_name = models.CharField(max_length=100)
+    response = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'AI Response Cache'
+        verbose_name_plural = 'AI Response Cache'
 
     def __str__(self):
-        return f"Submission by {self.participant} for {self.competition}"
\ No newline at end of file
+        return f"{self.model_name} {self.prompt_hash[:12]}"
@@ -0,0 +1,61 @@
+from collections import namedtuple
+from django.core.cache import cache
+from django.db import transaction
+from .models import UserProgress
+
+# Everything the dashboard pages show about a member's progress, cached as one value
+ProgressSnapshot = namedtuple(
+    'ProgressSnapshot', ['member_id', 'completed_course_ids', 'completed_count', 'total_points', 'current_level']
+)
+
+SNAPSHOT_TIMEOUT = 3600
+
+
+def _snapshot_key(member_id):
+    return f'dashboard:progress:{member_id}'
+
+
+def build_progress_snapshot(member_id):
+    """Read the member's progress from the database (two queries), creating the row if needed"""
+    user_progress, created = UserProgress.objects.get_or_create(member_id=member_id)
+    course_ids = frozenset(
+        UserProgress.completed_courses.through.objects.filter(
+            userprogress_id=user_progress.pk
+        ).values_list('course_id', flat=True)
+    )
+    return ProgressSnapshot(
+        member_id=member_id,
+        completed_course_ids=course_ids,
+        completed_count=len(course_ids),
+        total_points=user_progress.total_points,
+        current_level=user_progress.current_level,
+    )
+
+
+def get_progress_snapshot(member_id):
+    """Return the member's ProgressSnapshot from the shared cache, building it on a miss"""
+    snapshot = cache.get(_snapshot_key(member_id))
+    if snapshot is None:
+        snapshot = build_progress_snapshot(member_id)
+        cache.set(_snapshot_key(member_id), snapshot, SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def clear_progress_snapshots(member_ids):
+    """
+    Drop the cached snapshots of these members. Deferred to commit, so a page
+    rendered mid-transaction can't cache the old values again.
+    """
+    keys = [_snapshot_key(member_id) for member_id in member_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def clear_progress_snapshot_on_change(sender, instance, **kwargs):
+    """post_save/post_delete/m2m_changed handler for UserProgress"""
+    if isinstance(instance, UserProgress):
+        clear_progress_snapshots([instance.member_id])
+    elif kwargs.get('pk_set'):
+        # Reverse side of the m2m: courses added to or removed from several members' progress
+        member_ids = UserProgress.objects.filter(pk__in=kwargs['pk_set']).values_list('member_id', flat=True)
+        clear_progress_snapshots(list(member_ids))
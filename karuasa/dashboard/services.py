@@ -1,23 +1,182 @@
 # dashboard/services.py
 import google.generativeai as genai
+import hashlib
 import json
 import os
 import re
+import threading
+from bisect import bisect_right
+from datetime import timedelta
 from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, DateTimeField, Exists, F, IntegerField, Max, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, Floor
+from django.utils import timezone
+from .leaderboard import move_competition_score, move_points_total, rebuild_rank_counts
+from .models import AIResponseCache, Competition, CompetitionSubmission, GradingJob, PointsAward, UserProgress
+from .progress import clear_progress_snapshots
+
+class JSONObjectExtractor:
+    """
+    Incremental scanner that pulls the first complete JSON object out of model output.
+
+    Text can be fed in chunks as it arrives. Braces inside strings are ignored, so
+    markdown code fences, prose before or after the object and stray braces in the
+    surrounding text don't matter. If the output stops mid-object (e.g. the model hit
+    its token limit), close() repairs it by cutting back to the last complete element
+    and closing the open brackets.
+    """
+    CLOSERS = {'{': '}', '[': ']'}
 
-class CourseAIGenerator:
     def __init__(self):
+        self.buffer = []
+        self.stack = []
+        self.in_string = False
+        self.escaped = False
+        self.result = None
+        # (offset, open brackets) just before each comma inside the object
+        self.cut_points = []
+
+    def feed(self, chunk):
+        """Consume more text; returns the parsed object once one is complete, else None"""
+        for char in chunk:
+            if self.result is not None:
+                break
+            if not self.stack:
+                if char == '{':
+                    self.buffer = [char]
+                    self.stack = [char]
+                    self.cut_points = []
+                continue
+
+            self.buffer.append(char)
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in self.CLOSERS:
+                self.stack.append(char)
+            elif char in '}]':
+                self.stack.pop()
+                if not self.stack:
+                    self.result = self._parse(''.join(self.buffer))
+                    if self.result is None:
+                        # Balanced but invalid (e.g. a {placeholder} in prose); keep scanning
+                        self.buffer = []
+            elif char == ',':
+                self.cut_points.append((len(self.buffer) - 1, ''.join(self.stack)))
+        return self.result
+
+    def close(self):
+        """Finish the stream, repairing a truncated object if necessary"""
+        if self.result is not None or not self.stack:
+            return self.result
+
+        text = ''.join(self.buffer)
+        for offset, stack in reversed(self.cut_points[-50:]):
+            closing = ''.join(self.CLOSERS[opener] for opener in reversed(stack))
+            self.result = self._parse(text[:offset] + closing)
+            if self.result is not None:
+                print("🩹 Repaired truncated JSON response")
+                break
+        return self.result
+
+    @staticmethod
+    def _parse(text):
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return None
+        return value if isinstance(value, dict) else None
+
+
+def extract_json_object(text):
+    """Return the first JSON object in `text` (repairing truncated output), or None"""
+    extractor = JSONObjectExtractor()
+    return extractor.feed(text) or extractor.close()
+
+
+def validate_course_data(course_data):
+    """
+    Check generated course JSON against the shape the course pages need and fill in
+    optional fields. Returns a list of problems; an empty list means it is usable.
+    """
+    errors = []
+    for field in ('title', 'description'):
+        value = course_data.get(field)
+        if not isinstance(value, str) or not value.strip():
+            errors.append(f"'{field}' must be a non-empty string")
+
+    topics = course_data.get('topics')
+    if not isinstance(topics, list) or not topics or not all(isinstance(t, str) for t in topics):
+        errors.append("'topics' must be a non-empty list of strings")
+
+    lessons = course_data.get('lessons')
+    if not isinstance(lessons, list) or not lessons:
+        errors.append("'lessons' must be a non-empty list")
+    else:
+        for number, lesson in enumerate(lessons, 1):
+            if not isinstance(lesson, dict) or not all(
+                isinstance(lesson.get(key), str) and lesson.get(key).strip() for key in ('title', 'content')
+            ):
+                errors.append(f"lesson {number} needs a 'title' and 'content'")
+                continue
+            if not isinstance(lesson.setdefault('exercises', []), list):
+                errors.append(f"lesson {number} 'exercises' must be a list")
+
+    for field in ('learning_outcomes', 'prerequisites', 'resources'):
+        if not isinstance(course_data.setdefault(field, []), list):
+            errors.append(f"'{field}' must be a list")
+    course_data.setdefault('detailed_content', '')
+    return errors
+
+
+class CourseAIGenerator:
+    model_name = 'gemini-pro'
+
+    def __init__(self, use_cache=True):
         self.api_key = os.getenv('GEMINI_API_KEY')
         if not self.api_key:
             raise ValueError("❌ Gemini API key not found. Please set GEMINI_API_KEY environment variable.")
+        self.use_cache = use_cache
         
         try:
             genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel('gemini-pro')
+            self.model = genai.GenerativeModel(self.model_name)
             print("✅ Gemini AI configured successfully")
         except Exception as e:
             raise ValueError(f"❌ Failed to configure Gemini AI: {str(e)}")
     
+    def _generate(self, prompt, **generation_config):
+        """
+        Return the model's raw text for a prompt, reusing a stored response when the same
+        prompt, model and settings were sent before. Pass use_cache=False to force a fresh call.
+        """
+        key = json.dumps([self.model_name, prompt, generation_config], sort_keys=True)
+        prompt_hash = hashlib.sha256(key.encode()).hexdigest()
+
+        if self.use_cache:
+            cached = AIResponseCache.objects.filter(prompt_hash=prompt_hash).values_list('response', flat=True).first()
+            if cached is not None:
+                print("♻️ Using cached Gemini response")
+                return cached
+
+        response = self.model.generate_content(
+            prompt,
+            generation_config=genai.types.GenerationConfig(**generation_config)
+        )
+        content = response.text.strip()
+        AIResponseCache.objects.update_or_create(
+            prompt_hash=prompt_hash,
+            defaults={'model_name': self.model_name, 'response': content},
+        )
+        return content
+    
     def generate_course_content(self, topic, level='beginner', duration='4 weeks'):
         """
         Generate course content using Gemini API
@@ -141,34 +300,29 @@ class CourseAIGenerator:
         
         try:
             print("📡 Sending request to Gemini AI...")
-            response = self.model.generate_content(
+            content = self._generate(
                 prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.9,  # More creative
-                    top_p=0.8,
-                    top_k=40,
-                    max_output_tokens=4096,  # Increased for longer content
-                )
+                temperature=0.9,  # More creative
+                top_p=0.8,
+                top_k=40,
+                max_output_tokens=4096,  # Increased for longer content
             )
             print("✅ Received response from Gemini AI")
             
-            content = response.text.strip()
             print(f"📝 Raw AI response preview: {content[:300]}...")
             
-            # More robust JSON extraction
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
-            if json_match:
-                content = json_match.group()
-                print("✅ Extracted JSON from response")
-            else:
-                print("❌ No JSON found in response, using fallback")
-                return self._get_fallback_course(topic, level, duration)
-            
-            print(f"🧹 Cleaned content preview: {content[:200]}...")
-            
-            course_data = json.loads(content)
+            # Tolerates code fences, surrounding prose and truncated output
+            course_data = extract_json_object(content)
+            if course_data is None:
+                print("❌ No usable JSON found in response, trying again with different approach")
+                return self._generate_with_alternative_prompt(topic, level, duration)
             print("✅ Successfully parsed JSON response")
             
+            errors = validate_course_data(course_data)
+            if errors:
+                print(f"❌ Generated course failed validation: {'; '.join(errors)}")
+                return self._generate_with_alternative_prompt(topic, level, duration)
+            
             # Validate that we got actual generated content, not fallback
             if self._is_fallback_content(course_data, topic):
                 print("❌ Detected fallback-like content, trying again with different approach")
@@ -176,10 +330,6 @@ class CourseAIGenerator:
             
             return course_data
             
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON parsing error: {e}")
-            print(f"💡 Raw content that failed to parse: {content}")
-            return self._generate_with_alternative_prompt(topic, level, duration)
         except Exception as e:
             print(f"❌ Error generating course: {e}")
             return self._generate_with_alternative_prompt(topic, level, duration)
@@ -281,23 +431,20 @@ class CourseAIGenerator:
         """
         
         try:
-            response = self.model.generate_content(
+            content = self._generate(
                 alternative_prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.9,
-                    max_output_tokens=4096,
-                )
+                temperature=0.9,
+                max_output_tokens=4096,
             )
-            content = response.text.strip()
             
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
-            if json_match:
-                content = json_match.group()
-                course_data = json.loads(content)
-                print("✅ Alternative prompt successful")
-                return course_data
-            else:
+            course_data = extract_json_object(content)
+            if course_data is None:
                 raise ValueError("No JSON in alternative response")
+            errors = validate_course_data(course_data)
+            if errors:
+                raise ValueError(f"Invalid course JSON: {'; '.join(errors)}")
+            print("✅ Alternative prompt successful")
+            return course_data
                 
         except Exception as e:
             print(f"❌ Alternative prompt also failed: {e}")
@@ -414,4 +561,396 @@ class CourseAIGenerator:
             <h3>Expected Outcomes</h3>
             <p>Upon completion, students will possess advanced skills in {topic} methodologies and their practical application to complex actuarial challenges, positioning them for success in evolving insurance landscapes.</p>
             """
-        }
\ No newline at end of file
+        }
+
+
+class GradingError(Exception):
+    """Raised when a submission can't be scored; `retryable` is False for configuration problems"""
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+_grading_model = None
+_grading_model_lock = threading.Lock()
+
+
+def _get_grading_model():
+    """Configure Gemini once per process and share the model between worker threads"""
+    global _grading_model
+    with _grading_model_lock:
+        if _grading_model is None:
+            api_key = os.getenv('GEMINI_API_KEY', '')
+            if not api_key:
+                raise GradingError("Gemini API key not configured", retryable=False)
+            genai.configure(api_key=api_key)
+            _grading_model = genai.GenerativeModel('gemini-pro')
+    return _grading_model
+
+
+def evaluate_submission(problem_statement, solution):
+    """Score a competition solution from 0 to 100 with Gemini"""
+    prompt = f"""
+    As an actuarial science professor, evaluate this student's solution to the following problem:
+    
+    PROBLEM:
+    {problem_statement}
+    
+    STUDENT'S SOLUTION:
+    {solution}
+    
+    Please evaluate the solution on a scale of 0-100 based on:
+    1. Mathematical accuracy (40%)
+    2. Logical reasoning (30%)
+    3. Completeness (20%)
+    4. Clarity and presentation (10%)
+    
+    Return only the numerical score without any explanation.
+    """
+
+    response = _get_grading_model().generate_content(prompt)
+    match = re.search(r'\d+(?:\.\d+)?', response.text)
+    if not match:
+        raise GradingError(f"No score in model output: {response.text[:200]}")
+    return max(0, min(100, round(float(match.group()))))  # Ensure score is between 0-100
+
+
+def enqueue_grading(submission):
+    """Queue a submission for the grading worker, resetting any previous job"""
+    GradingJob.objects.update_or_create(
+        submission=submission,
+        defaults={'status': 'pending', 'attempts': 0, 'run_after': timezone.now(), 'last_error': ''},
+    )
+
+
+def enqueue_regrading(submissions):
+    """
+    Queue many submissions for the grading worker at once, e.g. from an admin action.
+    Jobs being graded right now are left alone. Returns the number of jobs queued.
+    """
+    submission_ids = list(submissions.values_list('pk', flat=True))
+    with transaction.atomic():
+        GradingJob.objects.bulk_create(
+            [GradingJob(submission_id=pk) for pk in submission_ids], batch_size=500, ignore_conflicts=True
+        )
+        return GradingJob.objects.filter(submission_id__in=submission_ids).exclude(status='running').update(
+            status='pending', attempts=0, run_after=timezone.now(), last_error=''
+        )
+
+
+def claim_grading_jobs(limit):
+    """
+    Atomically move up to `limit` due jobs from pending to running. The conditional
+    UPDATE means two workers can never claim the same job, on SQLite or MySQL.
+    """
+    candidates = GradingJob.objects.filter(
+        status='pending', run_after__lte=timezone.now()
+    ).values_list('id', flat=True)[:limit * 2]
+
+    claimed = []
+    for job_id in candidates:
+        if GradingJob.objects.filter(pk=job_id, status='pending').update(
+            status='running', attempts=F('attempts') + 1, updated_at=timezone.now()
+        ):
+            claimed.append(job_id)
+            if len(claimed) == limit:
+                break
+    return list(GradingJob.objects.select_related('submission__competition').filter(id__in=claimed))
+
+
+def release_stale_grading_jobs(older_than):
+    """
+    Return jobs left running by a worker that died back to the queue. updated_at
+    is stamped when a job is claimed, so this is measured from the claim.
+    """
+    return GradingJob.objects.filter(
+        status='running', updated_at__lt=timezone.now() - older_than
+    ).update(status='pending')
+
+
+# Points credited for each completed curriculum course
+COURSE_COMPLETION_POINTS = 100
+
+# Points needed to reach each level: level 1 from 0 points, level 2 from 200, ...
+LEVEL_THRESHOLDS = [0, 200, 500, 1000, 1800, 3000, 4500, 6500, 9000, 12000]
+
+
+def level_for_points(points):
+    """Level reached with `points`, per LEVEL_THRESHOLDS"""
+    return max(1, bisect_right(LEVEL_THRESHOLDS, points))
+
+
+def level_expression(points='total_points'):
+    """SQL equivalent of level_for_points() for the `points` column, for use in update()"""
+    return Case(
+        *[When(**{f'{points}__gte': threshold}, then=Value(level))
+          for level, threshold in reversed(list(enumerate(LEVEL_THRESHOLDS, start=1)))],
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+
+
+def competition_points(score):
+    """Points for a competition score: the score rounded half up, as in competition_points_expression"""
+    return int(score + 0.5)
+
+
+def competition_points_expression(score='score'):
+    return Cast(Floor(F(score) + 0.5), IntegerField())
+
+
+def _add_points(member_id, points):
+    """Credit (or debit) points with F(), move the member to the matching level and rank count"""
+    progress = UserProgress.objects.filter(member_id=member_id)
+    with transaction.atomic():
+        if points:
+            # Locked, so the total moved between rank counts is the one being changed
+            previous = progress.select_for_update().values_list('total_points', flat=True).first()
+            progress.update(total_points=F('total_points') + points)
+            if previous is not None:
+                move_points_total(previous, previous + points)
+        progress.update(current_level=level_expression())
+    clear_progress_snapshots([member_id])
+
+
+def record_score(submission, score):
+    """Store the score, record it in the points ledger and credit the participant in one transaction"""
+    with transaction.atomic():
+        # Lock the row so concurrent regrades of one submission are applied one at a time
+        previous_score = CompetitionSubmission.objects.select_for_update().values_list(
+            'score', flat=True).get(pk=submission.pk)
+        CompetitionSubmission.objects.filter(pk=submission.pk).update(score=score)
+        move_competition_score(submission.competition_id, previous_score, score)
+        UserProgress.objects.get_or_create(member_id=submission.participant_id)
+
+        # A regrade replaces the award, so only the difference is credited
+        points = competition_points(score)
+        award, created = PointsAward.objects.get_or_create(
+            member_id=submission.participant_id, reason='competition', object_id=submission.pk,
+            defaults={'points': points},
+        )
+        previous = 0 if created else award.points
+        if not created and award.points != points:
+            award.points = points
+            award.save(update_fields=['points', 'updated_at'])
+        _add_points(submission.participant_id, points - previous)
+        GradingJob.objects.filter(submission_id=submission.pk).update(status='done', last_error='')
+
+
+def run_grading_job(job, max_attempts, backoff_seconds):
+    """
+    Grade one claimed job. Failures are retried with exponential backoff until
+    `max_attempts` is reached. Returns the final job status.
+    """
+    submission = job.submission
+    try:
+        score = evaluate_submission(submission.competition.problem_statement, submission.solution)
+    except Exception as e:
+        retryable = getattr(e, 'retryable', True) and job.attempts < max_attempts
+        if retryable:
+            delay = backoff_seconds * 2 ** (job.attempts - 1)
+            GradingJob.objects.filter(pk=job.pk).update(
+                status='pending', last_error=str(e), run_after=timezone.now() + timedelta(seconds=delay)
+            )
+            return 'pending'
+        GradingJob.objects.filter(pk=job.pk).update(status='failed', last_error=str(e))
+        return 'failed'
+
+    record_score(submission, score)
+    return 'done'
+
+
+def complete_course(member_id, course_id):
+    """
+    Record a completed course and credit its points exactly once, however many
+    concurrent requests arrive. Returns True if this call completed the course.
+    """
+    CompletedCourse = UserProgress.completed_courses.through
+    with transaction.atomic():
+        user_progress, created = UserProgress.objects.get_or_create(member_id=member_id)
+        completed = CompletedCourse.objects.filter(userprogress_id=user_progress.pk, course_id=course_id)
+        if completed.exists():
+            return False
+        try:
+            # The (userprogress, course) unique index settles a race between two requests
+            with transaction.atomic():
+                CompletedCourse.objects.create(userprogress_id=user_progress.pk, course_id=course_id)
+        except IntegrityError:
+            return False
+        PointsAward.objects.create(
+            member_id=member_id, reason='course', object_id=course_id, points=COURSE_COMPLETION_POINTS
+        )
+        _add_points(member_id, COURSE_COMPLETION_POINTS)
+    return True
+
+
+def sync_points_ledger(member_ids=None):
+    """
+    Bring the points ledger in line with the completed courses and competition scores,
+    for the given members or everyone. Each step is one set-based statement.
+    """
+    CompletedCourse = UserProgress.completed_courses.through
+    completions = CompletedCourse.objects.all()
+    scored = CompetitionSubmission.objects.filter(score__isnull=False)
+    awards = PointsAward.objects.all()
+    if member_ids is not None:
+        completions = completions.filter(userprogress__member_id__in=member_ids)
+        scored = scored.filter(participant_id__in=member_ids)
+        awards = awards.filter(member_id__in=member_ids)
+
+    # Awards whose course completion or score has since been removed
+    awards.filter(reason='course').exclude(Exists(CompletedCourse.objects.filter(
+        userprogress__member_id=OuterRef('member_id'), course_id=OuterRef('object_id')
+    ))).delete()
+    awards.filter(reason='competition').exclude(Exists(scored.filter(
+        pk=OuterRef('object_id'), participant_id=OuterRef('member_id')
+    ))).delete()
+
+    # Scores changed without going through record_score, e.g. in the admin
+    awards.filter(reason='competition').update(points=Subquery(
+        CompetitionSubmission.objects.filter(pk=OuterRef('object_id'))
+        .values(points=competition_points_expression())[:1]
+    ))
+
+    # Awards still missing, inserted straight from the source tables
+    now = Value(timezone.now(), output_field=DateTimeField())
+    _insert_from_select(PointsAward, completions.exclude(Exists(PointsAward.objects.filter(
+        member_id=OuterRef('userprogress__member_id'), reason='course', object_id=OuterRef('course_id')
+    ))), {
+        'member_id': F('userprogress__member_id'), 'reason': Value('course'), 'object_id': F('course_id'),
+        'points': Value(COURSE_COMPLETION_POINTS), 'awarded_at': now, 'updated_at': now,
+    })
+    _insert_from_select(PointsAward, scored.exclude(Exists(PointsAward.objects.filter(
+        member_id=OuterRef('participant_id'), reason='competition', object_id=OuterRef('pk')
+    ))), {
+        'member_id': F('participant_id'), 'reason': Value('competition'), 'object_id': F('pk'),
+        'points': competition_points_expression(), 'awarded_at': now, 'updated_at': now,
+    })
+
+
+def _insert_from_select(model, queryset, columns):
+    """
+    INSERT INTO model's table SELECT ... from `queryset`, one expression per column,
+    so the rows never pass through Python. Returns the number of rows inserted.
+    """
+    qn = connection.ops.quote_name
+    select = queryset.annotate(**{f'insert_{column}': value for column, value in columns.items()})
+    sql, params = select.values_list(*[f'insert_{column}' for column in columns]).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {qn(model._meta.db_table)} ({', '.join(qn(column) for column in columns)}) {sql}",
+            params,
+        )
+        return cursor.rowcount
+
+
+def recalculate_total_points(member_ids=None):
+    """
+    Rebuild total_points and current_level from the points ledger for the given
+    members, or for everyone, in one UPDATE each after syncing the ledger. The
+    leaderboard's rank counts follow: member by member, or recounted for everyone.
+    Returns the number of members updated.
+    """
+    with transaction.atomic():
+        sync_points_ledger(member_ids)
+
+        progress = UserProgress.objects.all()
+        if member_ids is not None:
+            UserProgress.objects.bulk_create(
+                [UserProgress(member_id=member_id) for member_id in member_ids], ignore_conflicts=True
+            )
+            progress = progress.filter(member_id__in=member_ids)
+            previous = dict(progress.select_for_update().values_list('member_id', 'total_points'))
+        else:
+            # Members with awards but no progress row yet
+            UserProgress.objects.bulk_create(
+                [UserProgress(member_id=member_id) for member_id in
+                 PointsAward.objects.exclude(member__userprogress__isnull=False)
+                 .values_list('member_id', flat=True).distinct()],
+                ignore_conflicts=True,
+            )
+
+        totals = PointsAward.objects.filter(member_id=OuterRef('member_id')).values('member_id').annotate(
+            total=Sum('points')
+        ).values('total')
+        updated = progress.update(total_points=Coalesce(Subquery(totals), Value(0)))
+        # A separate UPDATE, so the levels see the new totals
+        progress.update(current_level=level_expression())
+
+        if member_ids is None:
+            rebuild_rank_counts()
+        else:
+            for member_id, total_points in progress.values_list('member_id', 'total_points'):
+                move_points_total(previous.get(member_id), total_points)
+
+        clear_progress_snapshots(
+            member_ids if member_ids is not None else progress.values_list('member_id', flat=True)
+        )
+    return updated
+
+
+COMPETITION_PROMPT = """
+Create an interesting and challenging actuarial science competition problem for university students.
+The problem should:
+1. Be related to practical actuarial applications
+2. Require mathematical and statistical reasoning
+3. Be solvable within 2-3 hours
+4. Include clear evaluation criteria
+5. Be appropriate for undergraduate actuarial students
+
+Provide the problem statement and evaluation criteria.
+"""
+
+
+def _start_of_next_month(moment):
+    local = timezone.localtime(moment)
+    year, month = (local.year + 1, 1) if local.month == 12 else (local.year, local.month + 1)
+    return local.replace(year=year, month=month, day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def generate_competition(start_date, end_date):
+    """
+    Write a competition problem with Gemini and save it for the given period. A
+    future competition is saved as scheduled and goes live through rotate_competitions.
+    """
+    response = _get_grading_model().generate_content(COMPETITION_PROMPT)
+    starts_now = start_date <= timezone.now()
+    return Competition.objects.create(
+        title=f"Actuarial Challenge {timezone.localtime(start_date).strftime('%B %Y')}",
+        description="Monthly actuarial competition testing your problem-solving skills",
+        problem_statement=response.text,
+        start_date=start_date,
+        end_date=end_date,
+        is_active=starts_now,
+        is_scheduled=not starts_now,
+    )
+
+
+def prepare_next_competition(now, last_run_at=None):
+    """
+    Scheduled task: make sure the competition that follows the current one already
+    exists, so the handover never waits on Gemini. It starts when the last current
+    competition ends (or now, if none is running) and runs to the end of that month.
+    """
+    # A scheduled one may have reached its start_date just before rotate_competitions runs
+    if Competition.objects.filter(Q(start_date__gt=now) | Q(is_scheduled=True)).exists():
+        return 'Next competition already prepared'
+    current_end = Competition.objects.filter(is_active=True, end_date__gt=now).aggregate(Max('end_date'))['end_date__max']
+    start_date = current_end or now
+    competition = generate_competition(start_date, _start_of_next_month(start_date))
+    return f'Prepared "{competition.title}"'
+
+
+def rotate_competitions(now, last_run_at=None):
+    """
+    Scheduled task: activate scheduled competitions whose start_date has come and
+    retire active ones past their end_date. Only those rows are touched, and both
+    happen in one transaction so the active list is never briefly empty.
+    """
+    with transaction.atomic():
+        activated = Competition.objects.filter(is_scheduled=True, start_date__lte=now).update(
+            is_scheduled=False, is_active=True
+        )
+        retired = Competition.objects.filter(is_active=True, end_date__lte=now).update(is_active=False)
+    return f'{activated} activated, {retired} retired'
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from .leaderboard import uncount_deleted
+from .models import CompetitionSubmission, UserProgress
+from .progress import clear_progress_snapshot_on_change
+
+# Cached dashboard progress snapshots are rebuilt after any change to the member's progress.
+# Queryset updates send no signal; the services that use them clear the snapshot themselves.
+post_save.connect(clear_progress_snapshot_on_change, sender=UserProgress, dispatch_uid='progress_snapshot_save')
+post_delete.connect(clear_progress_snapshot_on_change, sender=UserProgress, dispatch_uid='progress_snapshot_delete')
+m2m_changed.connect(
+    clear_progress_snapshot_on_change, sender=UserProgress.completed_courses.through,
+    dispatch_uid='progress_snapshot_courses',
+)
+
+# Deleted submissions and members leave the leaderboard's rank counts. Score and
+# points changes go through dashboard/services.py, which moves the counts itself.
+post_delete.connect(uncount_deleted, sender=CompetitionSubmission, dispatch_uid='rank_counts_submission_delete')
+post_delete.connect(uncount_deleted, sender=UserProgress, dispatch_uid='rank_counts_progress_delete')
@@ -1,3 +1,427 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from members.models import Member
+from .leaderboard import (
+    competition_leaderboard, competition_rank, global_leaderboard, global_rank, rebuild_rank_counts,
+    with_competition_rank,
+)
+from .models import (
+    Competition, CompetitionScoreCount, CompetitionSubmission, Course, GradingJob, PointsAward, PointsTotalCount,
+    UserProgress,
+)
+from .services import (
+    COURSE_COMPLETION_POINTS, LEVEL_THRESHOLDS, claim_grading_jobs, complete_course, enqueue_grading,
+    enqueue_regrading, level_expression, level_for_points, prepare_next_competition, recalculate_total_points,
+    record_score, release_stale_grading_jobs, rotate_competitions,
+)
 
-# Create your tests here.
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def create_competition(**kwargs):
+    now = timezone.now()
+    fields = {
+        'title': 'Challenge', 'description': 'Monthly challenge', 'problem_statement': 'Price this annuity',
+        'start_date': now - timedelta(days=1), 'end_date': now + timedelta(days=7),
+    }
+    fields.update(kwargs)
+    return Competition.objects.create(**fields)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class GradingQueueTests(TestCase):
+    """A job must only return to the queue when its worker stopped, not because it waited long to be claimed"""
+
+    STALE_AFTER = timedelta(minutes=15)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = Member.objects.create(username='solver', registration_number='SOL1')
+        cls.competition = create_competition()
+        cls.submission = CompetitionSubmission.objects.create(
+            competition=cls.competition, participant=cls.member, solution='42'
+        )
+
+    def queue_job(self, queued_ago):
+        enqueue_grading(self.submission)
+        # update() leaves auto_now alone, so this backdates the job
+        GradingJob.objects.filter(submission=self.submission).update(
+            run_after=timezone.now() - queued_ago, updated_at=timezone.now() - queued_ago
+        )
+
+    def test_job_queued_long_ago_is_not_released_after_claim(self):
+        self.queue_job(timedelta(hours=2))
+        claimed = claim_grading_jobs(5)
+
+        self.assertEqual([job.submission_id for job in claimed], [self.submission.pk])
+        self.assertEqual(release_stale_grading_jobs(self.STALE_AFTER), 0)
+        self.assertEqual(GradingJob.objects.get(submission=self.submission).status, 'running')
+
+    def test_job_of_a_dead_worker_is_released(self):
+        self.queue_job(timedelta(hours=2))
+        claim_grading_jobs(5)
+        GradingJob.objects.filter(submission=self.submission).update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+
+        self.assertEqual(release_stale_grading_jobs(self.STALE_AFTER), 1)
+        self.assertEqual(GradingJob.objects.get(submission=self.submission).status, 'pending')
+
+    def test_claimed_job_is_not_claimed_again(self):
+        self.queue_job(timedelta(minutes=1))
+        self.assertEqual(len(claim_grading_jobs(5)), 1)
+        self.assertEqual(claim_grading_jobs(5), [])
+
+    def test_regrading_queues_every_submission_not_being_graded(self):
+        others = [
+            CompetitionSubmission.objects.create(
+                competition=self.competition, solution='43',
+                participant=Member.objects.create(username=f'other{i}', registration_number=f'OTH{i}'),
+            )
+            for i in range(3)
+        ]
+        enqueue_grading(self.submission)
+        claim_grading_jobs(5)  # running: must not be graded twice
+        enqueue_grading(others[0])
+        GradingJob.objects.filter(submission=others[0]).update(status='failed', attempts=5)
+
+        queued = enqueue_regrading(CompetitionSubmission.objects.all())
+
+        self.assertEqual(queued, 3)
+        self.assertEqual(GradingJob.objects.get(submission=self.submission).status, 'running')
+        for submission in others:
+            job = GradingJob.objects.get(submission=submission)
+            self.assertEqual((job.status, job.attempts), ('pending', 0))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SubmissionStatusTests(TestCase):
+    """A submission whose grading failed must say so instead of showing it as still in progress"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = Member.objects.create(username='solver', registration_number='SOL1')
+        cls.competition = create_competition()
+        cls.submission = CompetitionSubmission.objects.create(
+            competition=cls.competition, participant=cls.member, solution='42'
+        )
+
+    def setUp(self):
+        self.client.force_login(self.member)
+
+    def test_failed_grading_is_shown(self):
+        enqueue_grading(self.submission)
+        GradingJob.objects.filter(submission=self.submission).update(status='failed')
+
+        response = self.client.get(reverse('dashboard:competitions'))
+        self.assertContains(response, 'Grading failed')
+        self.assertNotContains(response, 'Grading...')
+        response = self.client.get(reverse('dashboard:competition_detail', args=[self.competition.pk]))
+        self.assertContains(response, "couldn't grade your submission")
+
+    def test_queued_grading_is_shown_as_in_progress(self):
+        enqueue_grading(self.submission)
+
+        response = self.client.get(reverse('dashboard:competitions'))
+        self.assertContains(response, 'Grading...')
+        self.assertNotContains(response, 'Grading failed')
+
+
+class GenerateCourseContentTests(TestCase):
+    """A plain run must only fill in empty courses; replacing content takes --all"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Course.objects.create(course_code='calculus_1', name='Calculus 1', description='Limits', content='')
+        Course.objects.create(course_code='time_series', name='Time Series Analysis', description='ARIMA',
+                              content='<h2>Written by hand</h2>')
+
+    def dry_run(self, *args):
+        out = StringIO()
+        call_command('generate_course_content', '--dry-run', *args, stdout=out)
+        return out.getvalue()
+
+    def test_default_only_fills_empty_courses(self):
+        output = self.dry_run()
+        self.assertIn('calculus_1', output)
+        self.assertNotIn('time_series', output)
+
+    def test_all_regenerates_every_course(self):
+        output = self.dry_run('--all')
+        self.assertIn('calculus_1', output)
+        self.assertIn('time_series', output)
+
+    def test_resume_is_still_accepted(self):
+        self.assertEqual(self.dry_run('--resume'), self.dry_run())
+
+
+@override_settings(CACHES=TEST_CACHES)
+class LeaderboardRankTests(TestCase):
+    """The top-N tables and the "You are #N of M" lookups must agree, ties included"""
+
+    SCORES = [90, 80, 80, 70, 60]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.competition = create_competition()
+        cls.members = [
+            Member.objects.create(username=f'ranked{i}', registration_number=f'RNK{i}')
+            for i in range(len(cls.SCORES))
+        ]
+        cls.submissions = [
+            CompetitionSubmission.objects.create(competition=cls.competition, participant=member, solution='x')
+            for member in cls.members
+        ]
+        # Scores and points recorded the way the grading worker does, which keeps the rank counts
+        for submission, score in zip(cls.submissions, cls.SCORES):
+            record_score(submission, score)
+            submission.score = score
+
+    def setUp(self):
+        cache.clear()
+
+    def counts(self):
+        return (
+            sorted(CompetitionScoreCount.objects.values_list('competition_id', 'score', 'entries')),
+            sorted(PointsTotalCount.objects.values_list('total_points', 'entries')),
+        )
+
+    def test_ties_share_a_rank_in_the_competition_table(self):
+        leaderboard = competition_leaderboard(self.competition.pk)
+        self.assertEqual([submission.rank for submission in leaderboard], [1, 2, 2, 4, 5])
+        for submission in leaderboard:
+            self.assertEqual(competition_rank(submission), (submission.rank, len(self.SCORES)))
+
+    def test_ties_share_a_rank_in_the_global_table(self):
+        leaderboard = global_leaderboard()
+        self.assertEqual([entry.rank for entry in leaderboard], [1, 2, 2, 4, 5])
+        for entry in leaderboard:
+            self.assertEqual(global_rank(entry.total_points), (entry.rank, len(self.SCORES)))
+
+    def test_rank_is_one_query_over_the_counts(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(competition_rank(self.submissions[-1]), (5, 5))
+            self.assertEqual(global_rank(60), (5, 5))
+        self.assertEqual(len(queries), 2)
+
+    def test_ranks_follow_regrades_and_deletes(self):
+        newcomer = Member.objects.create(username='newcomer', registration_number='NEW1')
+        late = CompetitionSubmission.objects.create(competition=self.competition, participant=newcomer, solution='x')
+        record_score(late, 85)
+        late.refresh_from_db()
+        self.assertEqual(competition_rank(late), (2, 6))
+        self.assertEqual(global_rank(85), (2, 6))
+
+        record_score(late, 10)
+        late.refresh_from_db()
+        self.assertEqual(competition_rank(late), (6, 6))
+        self.assertEqual(competition_rank(self.submissions[1]), (2, 6))
+
+        late.delete()
+        self.submissions[0].delete()
+        self.assertEqual(competition_rank(self.submissions[1]), (1, 4))
+        newcomer.delete()
+        self.assertEqual(global_rank(90), (1, 5))
+
+    def test_ungraded_submissions_have_no_rank(self):
+        newcomer = Member.objects.create(username='newcomer', registration_number='NEW1')
+        CompetitionSubmission.objects.create(competition=self.competition, participant=newcomer, solution='x')
+        ranks = dict(with_competition_rank(CompetitionSubmission.objects.all()).values_list('participant_id', 'rank'))
+        self.assertIsNone(ranks[newcomer.pk])
+        self.assertEqual([ranks[member.pk] for member in self.members], [1, 2, 2, 4, 5])
+
+    def test_rebuild_agrees_with_the_incremental_counts(self):
+        counts = self.counts()
+        rebuild_rank_counts()
+        self.assertEqual(self.counts(), counts)
+
+    def test_admin_score_edits_are_recorded(self):
+        self.client.force_login(Member.objects.create_superuser(
+            username='admin', password='pw', registration_number='ADM1'))
+        submission = self.submissions[-1]
+        self.client.post(reverse('admin:dashboard_competitionsubmission_change', args=[submission.pk]), {
+            'competition': self.competition.pk, 'participant': submission.participant_id,
+            'solution': 'x', 'score': 95,
+        })
+        submission.refresh_from_db()
+        self.assertEqual(submission.score, 95)
+        self.assertEqual(competition_rank(submission), (1, 5))
+        self.assertEqual(global_rank(95), (1, 5))
+
+    def test_recalculating_one_member_moves_their_total(self):
+        CompetitionSubmission.objects.filter(pk=self.submissions[0].pk).update(score=75)
+        recalculate_total_points([self.members[0].pk])
+        self.assertEqual(global_rank(80), (1, 5))
+        self.assertEqual(global_rank(75), (3, 5))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class PointsLedgerTests(TestCase):
+    """recompute_progress rebuilds points from the ledger; record_score keeps it current"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Member.objects.create(username='alice', registration_number='ALI1')
+        cls.bob = Member.objects.create(username='bob', registration_number='BOB1')
+        cls.courses = [
+            Course.objects.create(course_code=f'course_{i}', name=f'Course {i}', description='-', content='-')
+            for i in range(2)
+        ]
+        cls.competition = create_competition()
+
+    def submit(self, member, score=None):
+        return CompetitionSubmission.objects.create(
+            competition=self.competition, participant=member, solution='x', score=score
+        )
+
+    def progress(self, member):
+        return UserProgress.objects.get(member=member)
+
+    def test_backfill_from_existing_completions_and_scores(self):
+        # Data from before the ledger existed: no awards, no points
+        progress = UserProgress.objects.create(member=self.alice)
+        progress.completed_courses.add(*self.courses)
+        self.submit(self.alice, score=72.5)
+        self.submit(self.bob, score=40)
+
+        recalculate_total_points()
+
+        self.assertEqual(self.progress(self.alice).total_points, 2 * COURSE_COMPLETION_POINTS + 73)
+        self.assertEqual(self.progress(self.bob).total_points, 40)
+        self.assertEqual(PointsAward.objects.filter(member=self.alice).count(), 3)
+
+        # Running it again changes nothing
+        recalculate_total_points()
+        self.assertEqual(PointsAward.objects.count(), 4)
+        self.assertEqual(self.progress(self.alice).total_points, 273)
+
+    def test_regrade_credits_only_the_difference(self):
+        submission = self.submit(self.alice)
+        record_score(submission, 80)
+        record_score(submission, 50)
+
+        self.assertEqual(self.progress(self.alice).total_points, 50)
+        self.assertEqual(PointsAward.objects.get(member=self.alice, reason='competition').points, 50)
+
+    def test_awards_without_a_source_are_removed(self):
+        complete_course(self.alice.pk, self.courses[0].pk)
+        submission = self.submit(self.alice)
+        record_score(submission, 90)
+        self.assertEqual(self.progress(self.alice).total_points, COURSE_COMPLETION_POINTS + 90)
+
+        self.progress(self.alice).completed_courses.clear()
+        submission.delete()
+        recalculate_total_points()
+
+        self.assertFalse(PointsAward.objects.filter(member=self.alice).exists())
+        self.assertEqual(self.progress(self.alice).total_points, 0)
+
+    def test_level_thresholds_at_the_boundary(self):
+        self.assertEqual(level_for_points(0), 1)
+        self.assertEqual(level_for_points(199), 1)
+        self.assertEqual(level_for_points(200), 2)
+        self.assertEqual(level_for_points(LEVEL_THRESHOLDS[-1]), len(LEVEL_THRESHOLDS))
+
+        # The SQL expression used by recalculate_total_points agrees
+        UserProgress.objects.create(member=self.alice, total_points=199)
+        UserProgress.objects.create(member=self.bob, total_points=200)
+        UserProgress.objects.update(current_level=level_expression())
+        self.assertEqual(self.progress(self.alice).current_level, 1)
+        self.assertEqual(self.progress(self.bob).current_level, 2)
+
+    def test_recalculate_only_touches_the_given_members(self):
+        self.submit(self.alice, score=60)
+        self.submit(self.bob, score=30)
+
+        self.assertEqual(recalculate_total_points([self.alice.pk]), 1)
+        self.assertEqual(self.progress(self.alice).total_points, 60)
+        self.assertFalse(UserProgress.objects.filter(member=self.bob).exists())
+        self.assertFalse(PointsAward.objects.filter(member=self.bob).exists())
+
+        self.assertEqual(recalculate_total_points(None), 2)
+        self.assertEqual(self.progress(self.bob).total_points, 30)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CompleteCourseTests(TestCase):
+    """Completing a course is recorded and paid for once, however often it is requested"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = Member.objects.create(username='student', registration_number='STU1')
+        cls.course = Course.objects.create(course_code='calculus_1', name='Calculus 1', description='-', content='-')
+
+    def points(self):
+        return UserProgress.objects.get(member=self.member).total_points
+
+    def test_second_completion_changes_nothing(self):
+        self.assertTrue(complete_course(self.member.pk, self.course.pk))
+        self.assertFalse(complete_course(self.member.pk, self.course.pk))
+
+        self.assertEqual(self.points(), COURSE_COMPLETION_POINTS)
+        self.assertEqual(PointsAward.objects.filter(member=self.member, reason='course').count(), 1)
+
+    def test_losing_a_race_credits_nothing(self):
+        complete_course(self.member.pk, self.course.pk)
+        # The other request inserted the completion after this one checked for it
+        with mock.patch('django.db.models.query.QuerySet.exists', return_value=False):
+            self.assertFalse(complete_course(self.member.pk, self.course.pk))
+        self.assertEqual(self.points(), COURSE_COMPLETION_POINTS)
+
+    def test_view_can_be_repeated(self):
+        self.client.force_login(self.member)
+        url = reverse('dashboard:mark_course_complete', args=[self.course.pk])
+        for _ in range(3):
+            self.assertRedirects(self.client.get(url), reverse('dashboard:my_courses'), fetch_redirect_response=False)
+
+        self.assertEqual(self.points(), COURSE_COMPLETION_POINTS)
+        self.assertEqual(list(UserProgress.objects.get(member=self.member).completed_courses.all()), [self.course])
+
+
+class CompetitionRotationTests(TestCase):
+    """The prepared competition takes over exactly when the current one ends"""
+
+    def setUp(self):
+        self.handover = timezone.now().replace(second=0, microsecond=0) + timedelta(hours=1)
+        self.current = create_competition(title='Current', end_date=self.handover)
+        self.upcoming = create_competition(
+            title='Upcoming', start_date=self.handover, end_date=self.handover + timedelta(days=30),
+            is_active=False, is_scheduled=True,
+        )
+
+    def active_titles(self):
+        return set(Competition.objects.filter(is_active=True).values_list('title', flat=True))
+
+    def test_nothing_changes_before_the_handover(self):
+        rotate_competitions(self.handover - timedelta(minutes=1))
+        self.assertEqual(self.active_titles(), {'Current'})
+
+    def test_handover_activates_the_next_and_retires_the_current(self):
+        rotate_competitions(self.handover)
+
+        self.assertEqual(self.active_titles(), {'Upcoming'})
+        self.upcoming.refresh_from_db()
+        self.assertFalse(self.upcoming.is_scheduled)
+
+    def test_prepared_competition_is_not_generated_twice(self):
+        with mock.patch('dashboard.services.generate_competition') as generate:
+            prepare_next_competition(self.handover - timedelta(minutes=30))
+            prepare_next_competition(self.handover + timedelta(seconds=30))  # before rotation has run
+        generate.assert_not_called()
+
+    def test_generate_competitions_command_also_rotates(self):
+        with mock.patch('dashboard.management.commands.generate_competitions.timezone.now',
+                        return_value=self.handover), \
+                mock.patch('dashboard.services.generate_competition') as generate:
+            call_command('generate_competitions', stdout=StringIO())
+
+        generate.assert_not_called()
+        self.assertEqual(self.active_titles(), {'Upcoming'})
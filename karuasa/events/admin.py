@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from .models import Event, EventPhoto
+from core.images import variant_url
+from core.uploads import BulkUploadAdminMixin
 
 class EventPhotoInline(admin.TabularInline):
     model = EventPhoto
@@ -9,18 +11,20 @@ class EventPhotoInline(admin.TabularInline):
     
     def display_image(self, obj):
         if obj.image:
-            return format_html('<img src="{}" width="100" height="75" style="object-fit: cover;" />', obj.image.url)
+            return format_html('<img src="{}" width="100" height="75" style="object-fit: cover;" />', variant_url(obj.image, 200))
         return "No Image"
     display_image.short_description = 'Preview'
 
 @admin.register(Event)
-class EventAdmin(admin.ModelAdmin):
+class EventAdmin(BulkUploadAdminMixin, admin.ModelAdmin):
     list_display = ['title', 'event_type', 'date', 'location', 'display_featured_image', 
                    'is_active', 'created_at']
     list_filter = ['event_type', 'is_active', 'date', 'created_at']
     list_editable = ['is_active', 'event_type']
     search_fields = ['title', 'description', 'location']
     readonly_fields = ['created_at']
+    bulk_upload_model = EventPhoto
+    bulk_upload_parent = 'event'
     inlines = [EventPhotoInline]
     date_hierarchy = 'date'
     
@@ -38,7 +42,7 @@ class EventAdmin(admin.ModelAdmin):
     
     def display_featured_image(self, obj):
         if obj.featured_image:
-            return format_html('<img src="{}" width="80" height="60" style="object-fit: cover;" />', obj.featured_image.url)
+            return format_html('<img src="{}" width="80" height="60" style="object-fit: cover;" />', variant_url(obj.featured_image, 200))
         return "No Image"
     display_featured_image.short_description = 'Image'
 
@@ -50,6 +54,6 @@ class EventPhotoAdmin(admin.ModelAdmin):
     
     def display_image(self, obj):
         if obj.image:
-            return format_html('<img src="{}" width="100" height="75" style="object-fit: cover;" />', obj.image.url)
+            return format_html('<img src="{}" width="100" height="75" style="object-fit: cover;" />', variant_url(obj.image, 200))
         return "No Image"
     display_image.short_description = 'Image'
\ No newline at end of file
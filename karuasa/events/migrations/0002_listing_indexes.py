@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['is_active', '-date', '-id'], name='events_even_is_acti_16070c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['is_active', 'event_type', '-date', '-id'], name='events_even_is_acti_0a4320_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-date', '-id'], name='event_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['event_type', '-date', '-id'], name='event_active_type_idx'),
+        ),
+    ]
@@ -15,6 +15,18 @@ class Event(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # One per event_list variant (all events / one type), each in keyset order
+        # (composite for MySQL, partial for SQLite/PostgreSQL, see blog.BlogPost)
+        indexes = [
+            models.Index(fields=['is_active', '-date', '-id']),
+            models.Index(fields=['is_active', 'event_type', '-date', '-id']),
+            models.Index(fields=['-date', '-id'], name='event_active_idx',
+                         condition=models.Q(is_active=True)),
+            models.Index(fields=['event_type', '-date', '-id'], name='event_active_type_idx',
+                         condition=models.Q(is_active=True)),
+        ]
+
     def __str__(self):
         return self.title
 
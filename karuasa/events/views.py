@@ -1,18 +1,17 @@
 from django.shortcuts import render, get_object_or_404
-from django.core.paginator import Paginator
+from core.pagination import KeysetPaginator
 from .models import Event
 
 def event_list(request):
-    events_list = Event.objects.filter(is_active=True).order_by('-date')
+    events_list = Event.objects.filter(is_active=True)
     
     # Filter by event type
     event_type = request.GET.get('type', '')
     if event_type:
         events_list = events_list.filter(event_type=event_type)
     
-    paginator = Paginator(events_list, 9)
-    page_number = request.GET.get('page')
-    events = paginator.get_page(page_number)
+    paginator = KeysetPaginator(events_list, 9, ordering=('-date', '-id'), count_timeout=300)
+    events = paginator.get_page(request.GET)
     
     context = {
         'events': events,
@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from .models import Album, Photo
+from core.images import variant_url
+from core.uploads import BulkUploadAdminMixin
 
 class PhotoInline(admin.TabularInline):
     model = Photo
@@ -9,22 +11,24 @@ class PhotoInline(admin.TabularInline):
     
     def display_image(self, obj):
         if obj.image:
-            return format_html('<img src="{}" width="100" height="75" style="object-fit: cover;" />', obj.image.url)
+            return format_html('<img src="{}" width="100" height="75" style="object-fit: cover;" />', variant_url(obj.image, 200))
         return "No Image"
     display_image.short_description = 'Preview'
 
 @admin.register(Album)
-class AlbumAdmin(admin.ModelAdmin):
+class AlbumAdmin(BulkUploadAdminMixin, admin.ModelAdmin):
     list_display = ['title', 'display_cover_image', 'photo_count', 'is_active', 'created_at']
     list_filter = ['is_active', 'created_at']
     list_editable = ['is_active']
     search_fields = ['title', 'description']
     readonly_fields = ['created_at']
+    bulk_upload_model = Photo
+    bulk_upload_parent = 'album'
     inlines = [PhotoInline]
     
     def display_cover_image(self, obj):
         if obj.cover_image:
-            return format_html('<img src="{}" width="80" height="60" style="object-fit: cover;" />', obj.cover_image.url)
+            return format_html('<img src="{}" width="80" height="60" style="object-fit: cover;" />', variant_url(obj.cover_image, 200))
         return "No Image"
     display_cover_image.short_description = 'Cover'
     
@@ -41,6 +45,6 @@ class PhotoAdmin(admin.ModelAdmin):
     
     def display_image(self, obj):
         if obj.image:
-            return format_html('<img src="{}" width="100" height="75" style="object-fit: cover;" />', obj.image.url)
+            return format_html('<img src="{}" width="100" height="75" style="object-fit: cover;" />', variant_url(obj.image, 200))
         return "No Image"
     display_image.short_description = 'Image'
\ No newline at end of file
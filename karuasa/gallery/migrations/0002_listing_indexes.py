@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='album',
+            index=models.Index(fields=['is_active', '-created_at', '-id'], name='gallery_alb_is_acti_659667_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='album',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', '-id'], name='album_active_idx'),
+        ),
+    ]
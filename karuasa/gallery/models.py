@@ -7,6 +7,14 @@ class Album(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # (composite for MySQL, partial for SQLite/PostgreSQL, see blog.BlogPost)
+        indexes = [
+            models.Index(fields=['is_active', '-created_at', '-id']),
+            models.Index(fields=['-created_at', '-id'], name='album_active_idx',
+                         condition=models.Q(is_active=True)),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -1,13 +1,12 @@
 from django.shortcuts import render, get_object_or_404
-from django.core.paginator import Paginator
+from core.pagination import KeysetPaginator
 from .models import Album
 
 def album_list(request):
-    albums_list = Album.objects.filter(is_active=True).order_by('-created_at')
+    albums_list = Album.objects.filter(is_active=True)
     
-    paginator = Paginator(albums_list, 12)
-    page_number = request.GET.get('page')
-    albums = paginator.get_page(page_number)
+    paginator = KeysetPaginator(albums_list, 12, count_timeout=300)
+    albums = paginator.get_page(request.GET)
     
     context = {
         'albums': albums,
@@ -2,6 +2,8 @@
 ASGI config for karuasa project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Production runs it under gunicorn's uvicorn worker so async views such as
+``core.views.chatbot_api`` can wait on Gemini without tying up a worker.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
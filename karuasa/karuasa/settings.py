@@ -115,6 +115,30 @@ else:
         }
     }
 
+# ==============================================================
+# CACHE CONFIGURATION
+# ==============================================================
+# File-based cache so every gunicorn worker sees the same entries
+# and signal-driven invalidation reaches all of them.
+# MAX_ENTRIES: once the directory holds this many files, a set() deletes a random
+# third of them, keys meant to never expire included. Django's default of 300 is far
+# below what the site keeps: a progress snapshot and a like index per member, variant
+# URLs per image and the rendered pages and fragments. The core backend only counts
+# the files on about one set() in 100, since listing a directory this size is slow.
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.SampledCullFileBasedCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')),
+        'TIMEOUT': 600,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '50000')),
+        },
+    }
+}
+
+# Seconds the rendered home page and its section fragments stay cached
+HOME_CACHE_TIMEOUT = int(os.getenv('HOME_CACHE_TIMEOUT', '600'))
+
 # ==============================================================
 # PASSWORD VALIDATION
 # ==============================================================
@@ -143,6 +167,23 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Resized derivatives of uploaded images (core/images.py), served through srcset.
+# 'avif' can be added to the formats where Pillow is built with libavif; it encodes slowly.
+IMAGE_VARIANT_WIDTHS = [200, 400, 800, 1200, 1920]
+IMAGE_VARIANT_FORMATS = ['webp']
+IMAGE_VARIANT_QUALITY = 80
+# Image fields whose derivatives are generated as soon as they are uploaded
+IMAGE_VARIANT_FIELDS = {
+    'projects.Project': ['featured_image'],
+    'blog.BlogPost': ['featured_image'],
+    'events.Event': ['featured_image'],
+    'events.EventPhoto': ['image'],
+    'gallery.Album': ['cover_image'],
+    'gallery.Photo': ['image'],
+    'core.SliderImage': ['image'],
+    'members.Member': ['profile_picture'],
+}
+
 # WhiteNoise for static files on Render
 if os.getenv('RENDER'):
     MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
@@ -183,6 +224,14 @@ LOGOUT_REDIRECT_URL = '/'
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 
+# Admin bulk photo upload (core/uploads.py). Files are downscaled to IMAGE_UPLOAD_MAX_DIMENSION
+# on their longest side by IMAGE_UPLOAD_WORKERS background processes.
+IMAGE_UPLOAD_MAX_FILES = 500
+IMAGE_UPLOAD_MAX_FILE_SIZE = 52428800  # 50MB, per image inside an archive
+IMAGE_UPLOAD_MAX_DIMENSION = 2560
+IMAGE_UPLOAD_WORKERS = int(os.getenv('IMAGE_UPLOAD_WORKERS', '2'))
+DATA_UPLOAD_MAX_NUMBER_FILES = IMAGE_UPLOAD_MAX_FILES
+
 # ==============================================================
 # DEFAULT FIELD TYPE
 # ==============================================================
@@ -197,6 +246,28 @@ AUTH_USER_MODEL = 'members.Member'
 # API KEYS AND EXTERNAL INTEGRATIONS
 # ==============================================================
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
+GEMINI_CHAT_MODEL = os.getenv('GEMINI_CHAT_MODEL', 'gemini-2.0-flash')
+GEMINI_CHAT_TIMEOUT = float(os.getenv('GEMINI_CHAT_TIMEOUT', '30'))
+# Upper bound on simultaneous upstream chatbot calls per worker process
+GEMINI_CHAT_MAX_CONCURRENCY = int(os.getenv('GEMINI_CHAT_MAX_CONCURRENCY', '20'))
+
+# Chatbot response cache: entry lifetime in seconds, LRU capacity, and the TF-IDF
+# cosine similarity a new question needs to reuse a cached answer (1 = exact matches only)
+CHATBOT_CACHE_TTL = int(os.getenv('CHATBOT_CACHE_TTL', str(7 * 24 * 3600)))
+CHATBOT_CACHE_MAX_ENTRIES = int(os.getenv('CHATBOT_CACHE_MAX_ENTRIES', '500'))
+CHATBOT_CACHE_SIMILARITY = float(os.getenv('CHATBOT_CACHE_SIMILARITY', '0.9'))
+
+# Competition grading worker (manage.py grade_submissions)
+GRADING_WORKERS = int(os.getenv('GRADING_WORKERS', '4'))
+GRADING_MAX_ATTEMPTS = int(os.getenv('GRADING_MAX_ATTEMPTS', '5'))
+GRADING_BACKOFF_SECONDS = float(os.getenv('GRADING_BACKOFF_SECONDS', '30'))
+
+# Recurring jobs run by `manage.py run_scheduler`: name -> (function, cron schedule).
+# Copied into core.ScheduledTask on first run; after that the schedule is edited in the admin.
+SCHEDULED_TASKS = {
+    'prepare-next-competition': ('dashboard.services.prepare_next_competition', '0 * * * *'),
+    'rotate-competitions': ('dashboard.services.rotate_competitions', '* * * * *'),
+}
 MPESA_CONSUMER_KEY = os.getenv('MPESA_CONSUMER_KEY', '')
 MPESA_CONSUMER_SECRET = os.getenv('MPESA_CONSUMER_SECRET', '')
 MPESA_EXPRESS_SHORTCODE = os.getenv('MPESA_SHORTCODE', '')
@@ -300,6 +371,8 @@ JAZZMIN_SETTINGS = {
         "core.Constitution": "fas fa-file-contract",
         "core.SliderImage": "fas fa-images",
         "core.ContactMessage": "fas fa-envelope",
+        "core.ChatbotResponse": "fas fa-robot",
+        "core.Like": "fas fa-heart",
         "events.Event": "fas fa-calendar-alt",
         "events.EventPhoto": "fas fa-camera",
         "projects.Project": "fas fa-project-diagram",
@@ -314,6 +387,8 @@ JAZZMIN_SETTINGS = {
         "dashboard.Competition": "fas fa-trophy",
         "dashboard.CompetitionSubmission": "fas fa-upload",
         "dashboard.UserProgress": "fas fa-chart-line",
+        "dashboard.GradingJob": "fas fa-tasks",
+        "dashboard.AIResponseCache": "fas fa-database",
     },
     
     # Icons that are used when one is not manually specified
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0002_delete_paymenttransaction'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['email'], name='members_member_email_idx'),
+        ),
+    ]
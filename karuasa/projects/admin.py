@@ -1,6 +1,9 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from .models import Project, ProjectComment
+from core.signals import clear_home_cache
+from core.search import reindex
+from core.images import variant_url
 
 class ProjectCommentInline(admin.TabularInline):
     model = ProjectComment
@@ -45,22 +48,28 @@ class ProjectAdmin(admin.ModelAdmin):
 
     def display_featured_image(self, obj):
         if obj.featured_image:
-            return format_html('<img src="{}" width="80" height="60" style="object-fit: cover;" />', obj.featured_image.url)
+            return format_html('<img src="{}" width="80" height="60" style="object-fit: cover;" />', variant_url(obj.featured_image, 200))
         return "No Image"
     display_featured_image.short_description = 'Image'
 
     def approve_projects(self, request, queryset):
+        # A filtered changelist's queryset may no longer match once updated
+        pks = list(queryset.values_list('pk', flat=True))
         queryset.update(is_approved=True)
-        self.message_user(request, f'{queryset.count()} projects approved.')
+        reindex(Project.objects.filter(pk__in=pks))
+        clear_home_cache()
+        self.message_user(request, f'{len(pks)} projects approved.')
     approve_projects.short_description = "Approve selected projects"
 
     def feature_projects(self, request, queryset):
         queryset.update(is_featured=True)
+        clear_home_cache()
         self.message_user(request, f'{queryset.count()} projects featured.')
     feature_projects.short_description = "Feature selected projects"
 
     def unfeature_projects(self, request, queryset):
         queryset.update(is_featured=False)
+        clear_home_cache()
         self.message_user(request, f'{queryset.count()} projects unfeatured.')
     unfeature_projects.short_description = "Unfeature selected projects"
 
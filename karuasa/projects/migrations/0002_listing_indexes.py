@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['is_approved', '-created_at', '-id'], name='projects_pr_is_appr_14ccf6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['is_approved', 'is_featured', '-created_at', '-id'], name='projects_pr_is_appr_1d010d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['-created_at', '-id'], name='project_approved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('is_approved', True), ('is_featured', True)), fields=['-created_at', '-id'], name='project_featured_idx'),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
 from members.models import Member
 
@@ -14,6 +15,19 @@ class Project(models.Model):
     shares = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    like_records = GenericRelation('core.Like')  # Deleted along with the object
+
+    class Meta:
+        # One per project_list variant (all approved / featured only), each in keyset order
+        # (composite for MySQL, partial for SQLite/PostgreSQL, see blog.BlogPost)
+        indexes = [
+            models.Index(fields=['is_approved', '-created_at', '-id']),
+            models.Index(fields=['is_approved', 'is_featured', '-created_at', '-id']),
+            models.Index(fields=['-created_at', '-id'], name='project_approved_idx',
+                         condition=models.Q(is_approved=True)),
+            models.Index(fields=['-created_at', '-id'], name='project_featured_idx',
+                         condition=models.Q(is_approved=True, is_featured=True)),
+        ]
 
     def __str__(self):
         return self.title
@@ -7,6 +7,6 @@ urlpatterns = [
     path('', views.project_list, name='project_list'),
     path('<int:pk>/', views.project_detail, name='project_detail'),
     path('add/', views.add_project, name='add_project'),
-    path('projects/<int:pk>/like/', views.like_project, name='like_project'),
-    path('projects/<int:pk>/share/', views.share_project, name='share_project'),
+    path('<int:project_id>/like/', views.like_project, name='like_project'),
+    path('<int:project_id>/share/', views.share_project, name='share_project'),
 ]
\ No newline at end of file
@@ -1,27 +1,29 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.http import JsonResponse
 from .models import Project, ProjectComment
 from .forms import ProjectForm, ProjectCommentForm
 from django.views.decorators.http import require_POST
+from core.counters import increment_counter
+from core.likes import like_object, liked_ids
+from core.pagination import KeysetPaginator
 
 def project_list(request):
-    projects_list = Project.objects.filter(is_approved=True).order_by('-created_at')
+    projects_list = Project.objects.filter(is_approved=True)
     
     # Filter featured projects
     featured = request.GET.get('featured', '')
     if featured:
         projects_list = projects_list.filter(is_featured=True)
     
-    paginator = Paginator(projects_list, 9)
-    page_number = request.GET.get('page')
-    projects = paginator.get_page(page_number)
+    paginator = KeysetPaginator(projects_list, 9, count_timeout=300)
+    projects = paginator.get_page(request.GET)
     
     context = {
         'projects': projects,
         'featured': featured,
+        'liked_project_ids': liked_ids(request.user, Project, [project.pk for project in projects]),
     }
     return render(request, 'projects/project_list.html', context)
 
@@ -72,27 +74,21 @@ def add_project(request):
 @require_POST
 @login_required
 def like_project(request, project_id):
-    try:
-        project = Project.objects.get(id=project_id)
-        project.likes += 1
-        project.save()
-        
-        return JsonResponse({
-            'success': True,
-            'new_like_count': project.likes
-        })
-    except Project.DoesNotExist:
+    likes, created = like_object(request.user, Project, project_id)
+    if likes is None:
         return JsonResponse({'success': False}, status=404)
+    return JsonResponse({
+        'success': True,
+        'new_like_count': likes,
+        'liked': True,
+    })
 
 @require_POST
 def share_project(request, project_id):
-    try:
-        project = Project.objects.get(id=project_id)
-        project.shares += 1
-        project.save()
-        return JsonResponse({
-            'success': True,
-            'new_share_count': project.shares
-        })
-    except Project.DoesNotExist:
-        return JsonResponse({'success': False}, status=404)
\ No newline at end of file
+    shares = increment_counter(Project, project_id, 'shares')
+    if shares is None:
+        return JsonResponse({'success': False}, status=404)
+    return JsonResponse({
+        'success': True,
+        'new_share_count': shares
+    })
\ No newline at end of file
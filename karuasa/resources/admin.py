@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import ResourceCategory, Resource
+from core.search import reindex
 
 @admin.register(ResourceCategory)
 class ResourceCategoryAdmin(admin.ModelAdmin):
@@ -35,11 +36,16 @@ class ResourceAdmin(admin.ModelAdmin):
     actions = ['activate_resources', 'deactivate_resources']
 
     def activate_resources(self, request, queryset):
+        # A filtered changelist's queryset may no longer match once updated
+        pks = list(queryset.values_list('pk', flat=True))
         queryset.update(is_active=True)
-        self.message_user(request, f'{queryset.count()} resources activated.')
+        reindex(Resource.objects.filter(pk__in=pks))
+        self.message_user(request, f'{len(pks)} resources activated.')
     activate_resources.short_description = "Activate selected resources"
 
     def deactivate_resources(self, request, queryset):
+        pks = list(queryset.values_list('pk', flat=True))
         queryset.update(is_active=False)
-        self.message_user(request, f'{queryset.count()} resources deactivated.')
+        reindex(Resource.objects.filter(pk__in=pks))
+        self.message_user(request, f'{len(pks)} resources deactivated.')
     deactivate_resources.short_description = "Deactivate selected resources"
\ No newline at end of file
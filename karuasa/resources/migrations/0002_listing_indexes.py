@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(fields=['is_active', '-created_at', '-id'], name='resources_r_is_acti_0b6532_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(fields=['is_active', 'resource_type', 'category', '-created_at', '-id'], name='resources_r_is_acti_3b4192_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', '-id'], name='resource_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['resource_type', 'category', '-created_at', '-id'], name='resource_active_type_idx'),
+        ),
+    ]
@@ -29,5 +29,17 @@ class Resource(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Unfiltered and type/category-filtered resource_list; category-only filters use the
+        # category FK index (composite for MySQL, partial for SQLite/PostgreSQL, see blog.BlogPost)
+        indexes = [
+            models.Index(fields=['is_active', '-created_at', '-id']),
+            models.Index(fields=['is_active', 'resource_type', 'category', '-created_at', '-id']),
+            models.Index(fields=['-created_at', '-id'], name='resource_active_idx',
+                         condition=models.Q(is_active=True)),
+            models.Index(fields=['resource_type', 'category', '-created_at', '-id'],
+                         name='resource_active_type_idx', condition=models.Q(is_active=True)),
+        ]
+
     def __str__(self):
         return self.title
\ No newline at end of file
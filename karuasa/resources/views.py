@@ -1,9 +1,9 @@
 from django.shortcuts import render, get_object_or_404
-from django.core.paginator import Paginator
+from core.pagination import KeysetPaginator
 from .models import Resource, ResourceCategory
 
 def resource_list(request):
-    resources_list = Resource.objects.filter(is_active=True).order_by('-created_at')
+    resources_list = Resource.objects.filter(is_active=True)
     
     # Filter by resource type
     resource_type = request.GET.get('type', '')
@@ -15,9 +15,8 @@ def resource_list(request):
     if category_id:
         resources_list = resources_list.filter(category_id=category_id)
     
-    paginator = Paginator(resources_list, 12)
-    page_number = request.GET.get('page')
-    resources = paginator.get_page(page_number)
+    paginator = KeysetPaginator(resources_list, 12, count_timeout=300)
+    resources = paginator.get_page(request.GET)
     
     categories = ResourceCategory.objects.all()
     
@@ -0,0 +1,27 @@
+#!/usr/bin/env bash
+# exit on error
+set -o errexit
+
+# Navigate to Django project directory
+cd karuasa
+
+# Run a background command for as long as the service is up, restarting it if it exits
+keep_running() {
+    while true; do
+        "$@" || echo "'$*' exited with status $?"
+        echo "Restarting '$*' in 5 seconds"
+        sleep 5
+    done
+}
+
+# The background workers run next to the web server rather than as separate Render
+# services: on Render the SQLite database and the file cache live on this service's disk.
+
+# Grade queued competition submissions with Gemini
+keep_running python manage.py grade_submissions &
+
+# Recurring tasks in core.ScheduledTask, e.g. preparing and rotating competitions
+keep_running python manage.py run_scheduler &
+
+# Start the web server
+exec gunicorn karuasa.asgi:application -k uvicorn.workers.UvicornWorker